@@ -0,0 +1,268 @@
+"""Timing suite for the Quick Studio and Camera From View add-ons.
+
+Runs inside Blender, without a 3D viewport:
+    
+    blender --background --factory-startup --python benchmarks/rig_benchmarks.py -- \
+        --output results.json --baseline baseline.json
+
+Every case is timed on synthetic scenes of 1k, 10k and 100k objects. With
+--baseline, cases whose median got slower than the threshold allows are
+reported and Blender exits with status 1.
+"""
+
+import bpy
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from itertools import chain
+from mathutils import Matrix
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+
+# Medians this much slower than the baseline count as a regression...
+DEFAULT_THRESHOLD = 0.25
+# ...unless the absolute difference is below timer noise.
+MIN_DELTA_MS = 0.05
+
+def parse_args(argv):
+    """Parse the arguments following '--' on the Blender command line"""
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    
+    parser = argparse.ArgumentParser(
+        prog="blender --background --python benchmarks/rig_benchmarks.py --",
+        description="Time Quick Studio and Camera From View operations on synthetic scenes",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="Object counts of the synthetic scenes")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed runs per case; the median is compared against the baseline")
+    parser.add_argument("--output", metavar="FILE",
+                        help="Write the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="Compare the results against a stored baseline")
+    parser.add_argument("--save-baseline", metavar="FILE",
+                        help="Store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown as a fraction of the baseline median (0.25 = 25%%)")
+    parser.add_argument("--addon-dir", default=ADDON_DIR,
+                        help="Directory containing studio-setup.py and camera.py")
+    return parser.parse_args(argv)
+
+def load_addon(path, module_name):
+    """Import a single-file add-on by path and register it"""
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    module.register()
+    return module
+
+def clear_scene(scene):
+    """Remove everything from the file except the scene itself"""
+    for rig_index in reversed(range(len(scene.quickstudio_rigs))):
+        scene.quickstudio_rigs.remove(rig_index)
+    bpy.data.batch_remove(list(bpy.data.objects) + list(bpy.data.collections))
+    bpy.data.batch_remove(list(bpy.data.lights) + list(bpy.data.cameras) + list(bpy.data.meshes))
+
+def populate_scene(scene, count):
+    """Fill the scene with count objects: one mesh target and count - 1 empties"""
+    collection = bpy.data.collections.new("BENCH")
+    scene.collection.children.link(collection)
+    
+    mesh = bpy.data.meshes.new("BenchTarget")
+    mesh.from_pydata([(x, y, z) for x in (-1, 1) for y in (-1, 1) for z in (-1, 1)], [], [])
+    target = bpy.data.objects.new("BenchTarget", mesh)
+    collection.objects.link(target)
+    
+    for index in range(count - 1):
+        obj = bpy.data.objects.new(f"Empty.{index:06d}", None)
+        collection.objects.link(obj)
+        obj.location = (index % 100, (index // 100) % 100, index // 10000)
+    
+    # A few cameras following the add-on's naming, so name allocation has something to skip
+    for index in range(1, 4):
+        camera = bpy.data.objects.new(f"CAM_{index:03d}", bpy.data.cameras.new(f"CAM_{index:03d}"))
+        collection.objects.link(camera)
+    
+    bpy.context.view_layer.update()
+    return target
+
+def measure(func, repeat, setup=None, teardown=None):
+    """Time func repeat times; setup and teardown run outside the timed section"""
+    samples = []
+    for _run in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if teardown:
+            teardown()
+    
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "runs": repeat,
+    }
+
+def toggle(owner, attr, first, second):
+    """Return a callable that alternates owner.attr between two values, running its update callback"""
+    values = [first, second]
+    def run():
+        values.reverse()
+        setattr(owner, attr, values[0])
+    return run
+
+def toggle_case(name, owner, attr, first, second):
+    """Yield one toggle case, then put owner.attr back to first
+    
+    After an odd number of runs the toggle ends on second, which would leave
+    the following cases timing a different state.
+    """
+    yield name, toggle(owner, attr, first, second), None, None
+    setattr(owner, attr, first)
+
+def studio_cases(studio, scene, target):
+    """Yield (name, func, setup, teardown) for the Quick Studio add-on
+    
+    Cases are measured as they are yielded, so the rig built halfway through
+    exists while the update callbacks run.
+    """
+    def create():
+        bpy.ops.quickstudio.create_studio()
+    
+    def reset():
+        bpy.ops.quickstudio.reset_studio()
+    
+    yield "create_studio", create, None, reset
+    yield "reset_studio", reset, create, None
+    
+    create()
+    rig = studio.get_active_rig(scene)
+    
+    yield from toggle_case("update_camera_track_toggle", rig, "use_camera_track", False, True)
+    yield from toggle_case("update_camera_target", rig, "camera_target", None, target)
+    yield from toggle_case("update_light_target", rig, "light_target", None, target)
+    yield from toggle_case("update_dof_target", rig, "dof_use_target", False, True)
+    yield from toggle_case("update_control_mode", rig, "control_mode", 'DRIVERS', 'BAKED')
+    yield from toggle_case("update_background_color", scene, "quickstudio_bg_color", (0.05, 0.05, 0.05), (0.8, 0.8, 0.8))
+    yield from toggle_case("update_background_transparent", scene, "quickstudio_bg_transparent", False, True)
+    
+    rig.camera_target = target
+    yield from toggle_case("update_auto_frame", rig, "auto_frame", False, True)
+    
+    # QUICKSTUDIO_PT_panel.draw needs a UI layout; time the rig state it derives instead
+    yield "panel_state_cold", lambda: studio.get_rig_state(scene, rig), studio.invalidate_rig_state, None
+    yield "panel_state_warm", lambda: studio.get_rig_state(scene, rig), None, None
+    
+    reset()
+
+def camera_cases(camera, scene):
+    """Yield (name, func, setup, teardown) for the Camera From View add-on"""
+    # VERTEXLAB_OT_camera_from_view reads the viewport's region_3d, which does not
+    # exist in background mode; time the naming and creation it performs instead.
+    matrix = Matrix.Translation((0.0, -10.0, 2.0))
+    created = []
+    
+    def camera_from_view():
+        name = camera.allocate_camera_names(scene, 1)[0]
+        created.append(camera.create_camera_from_matrix(scene.collection, name, matrix))
+    
+    def drop_name_index():
+        scene.pop(camera.NAME_INDEX_KEY, None)
+    
+    def remove_created():
+        bpy.data.batch_remove([obj.data for obj in created] + created)
+        created.clear()
+    
+    yield "camera_from_view_cold", camera_from_view, drop_name_index, remove_created
+    yield "camera_from_view_warm", camera_from_view, None, remove_created
+    yield "allocate_camera_names_16", lambda: camera.allocate_camera_names(scene, 16), None, None
+    
+    states = [camera.view_state_from_matrix(matrix.inverted(), ortho=index % 2 == 1) for index in range(16)]
+    
+    def cameras_from_states():
+        names = camera.allocate_camera_names(scene, len(states))
+        created.extend(camera.create_cameras_from_states(scene.collection, names, states))
+    
+    yield "create_cameras_from_states_16", cameras_from_states, None, remove_created
+
+def run_suite(args):
+    """Run every case on every scene size and return the results dictionary"""
+    studio = load_addon(os.path.join(args.addon_dir, "studio-setup.py"), "quickstudio_bench")
+    camera = load_addon(os.path.join(args.addon_dir, "camera.py"), "camera_from_view_bench")
+    scene = bpy.context.scene
+    
+    results = {}
+    for size in args.sizes:
+        clear_scene(scene)
+        scene.pop(camera.NAME_INDEX_KEY, None)
+        start = time.perf_counter()
+        target = populate_scene(scene, size)
+        print(f"[bench] {size} objects ready in {time.perf_counter() - start:.1f} s")
+        
+        cases = {}
+        for name, func, setup, teardown in chain(studio_cases(studio, scene, target), camera_cases(camera, scene)):
+            cases[name] = measure(func, args.repeat, setup, teardown)
+            print(f"[bench] {size:>7} {name:<32} {cases[name]['median_ms']:10.3f} ms")
+        results[str(size)] = cases
+    
+    clear_scene(scene)
+    return {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+def compare(report, baseline, threshold):
+    """Return (size, case, baseline ms, current ms) for every regressed case"""
+    regressions = []
+    for size, cases in baseline["results"].items():
+        for name, stats in cases.items():
+            current = report["results"].get(size, {}).get(name)
+            if current is None:
+                continue
+            before = stats["median_ms"]
+            after = current["median_ms"]
+            if after > before * (1.0 + threshold) and after - before > MIN_DELTA_MS:
+                regressions.append((size, name, before, after))
+    return regressions
+
+def write_json(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def main(argv):
+    args = parse_args(argv)
+    report = run_suite(args)
+    
+    if args.output:
+        write_json(args.output, report)
+    if args.save_baseline:
+        write_json(args.save_baseline, report)
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("blender") != report["blender"]:
+            print(f"[bench] baseline was recorded with Blender {baseline.get('blender')}, running {report['blender']}")
+        
+        regressions = compare(report, baseline, args.threshold)
+        for size, name, before, after in regressions:
+            print(f"[bench] REGRESSION {size} {name}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"[bench] no regressions above {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -14,64 +14,585 @@ import bpy
 import math
 from mathutils import Matrix
 
+# Scene ID property mapping each name prefix to the highest suffix handed out
+NAME_INDEX_KEY = "vertexlab_camera_index"
+
+DEFAULT_PREFIX = "CAM_"
+DEFAULT_PADDING = 3
+
+BOOKMARK_CAMERA_NAME = "View Bookmark"
+
+# Filled in by the Quick Studio profiler while it is enabled, so update
+# callbacks here are timed alongside its own; None costs one lookup
+_profile_hook = {"update": None}
+
+def profiled_update(func):
+    """Route an update callback through the Quick Studio profiler when it is enabled"""
+    name = func.__name__
+    
+    def wrapper(self, context):
+        hook = _profile_hook["update"]
+        if hook is None:
+            return func(self, context)
+        return hook(name, func, self, context)
+    
+    wrapper.__name__ = name
+    return wrapper
+
+# The viewport draws a 36mm sensor at twice the camera zoom, so its lens
+# frames like a camera lens on a 72mm sensor
+VIEWPORT_SENSOR_WIDTH = 72.0
+CAMERA_SENSOR_WIDTH = 36.0
+
+class VERTEXLAB_AP_camera_from_view(bpy.types.AddonPreferences):
+    """Naming convention for cameras created from the viewport"""
+    bl_idname = __name__
+    
+    camera_prefix: bpy.props.StringProperty(
+        name="Name Prefix",
+        description="Prefix of generated camera names",
+        default=DEFAULT_PREFIX,
+    )
+    camera_padding: bpy.props.IntProperty(
+        name="Number Padding",
+        description="Number of digits in generated camera names",
+        default=DEFAULT_PADDING,
+        min=1,
+        max=8,
+    )
+    
+    def draw(self, context):
+        row = self.layout.row()
+        row.prop(self, "camera_prefix")
+        row.prop(self, "camera_padding")
+
+def get_naming_settings(context):
+    """Return the (prefix, padding) configured in the add-on preferences"""
+    addon = context.preferences.addons.get(__name__)
+    if addon is None:
+        return DEFAULT_PREFIX, DEFAULT_PADDING
+    return addon.preferences.camera_prefix, addon.preferences.camera_padding
+
+def get_name_index(scene, prefix):
+    """Return the scene's name index, seeding the prefix with a single scan on first use"""
+    if NAME_INDEX_KEY not in scene:
+        scene[NAME_INDEX_KEY] = {}
+    index = scene[NAME_INDEX_KEY]
+    
+    if prefix not in index:
+        highest = 0
+        # Only cameras seed the counter; allocate_camera_names still skips
+        # names taken by any other object
+        for obj in bpy.data.objects:
+            if obj.type != 'CAMERA':
+                continue
+            suffix = obj.name[len(prefix):]
+            if obj.name.startswith(prefix) and suffix.isdigit():
+                highest = max(highest, int(suffix))
+        index[prefix] = highest
+    
+    return index
+
+def allocate_camera_names(scene, count=1, prefix=DEFAULT_PREFIX, padding=DEFAULT_PADDING):
+    """Reserve count unique camera names (CAM_001, CAM_002, ...) in a single pass"""
+    index = get_name_index(scene, prefix)
+    suffix = index[prefix]
+    
+    names = []
+    while len(names) < count:
+        suffix += 1
+        name = f"{prefix}{str(suffix).zfill(padding)}"
+        # Validate lazily: objects may have been appended or renamed by hand
+        if bpy.data.objects.get(name) is None:
+            names.append(name)
+    
+    index[prefix] = suffix
+    return names
+
+def create_camera_from_matrix(collection, name, matrix):
+    """Create a camera object called name at the given world matrix"""
+    camera_data = bpy.data.cameras.new(name=name)
+    camera_object = bpy.data.objects.new(name=name, object_data=camera_data)
+    collection.objects.link(camera_object)
+    camera_object.matrix_world = matrix
+    return camera_object
+
+def view_state_from_matrix(view_matrix, lens=50.0, ortho=False, view_distance=10.0, clip_start=0.01, clip_end=1000.0):
+    """Return the camera state of a viewport given by its stored view matrix and settings"""
+    return {
+        "matrix": view_matrix.inverted(),
+        "type": 'ORTHO' if ortho else 'PERSP',
+        "lens": lens * CAMERA_SENSOR_WIDTH / VIEWPORT_SENSOR_WIDTH,
+        # Width the viewport shows at the view distance
+        "ortho_scale": view_distance * VIEWPORT_SENSOR_WIDTH / lens,
+        "sensor_width": CAMERA_SENSOR_WIDTH,
+        "sensor_fit": 'AUTO',
+        "shift_x": 0.0,
+        "shift_y": 0.0,
+        "clip_start": clip_start,
+        "clip_end": clip_end,
+    }
+
+def capture_view_state(region_3d, space, scene=None):
+    """Return the camera state seen through a 3D viewport
+    
+    Only reads region_3d and its SpaceView3D, so it works from scripts and
+    timers without a VIEW_3D context. Looking through the scene camera
+    returns that camera's own settings.
+    """
+    camera_object = scene.camera if scene is not None else space.camera
+    if region_3d.view_perspective == 'CAMERA' and camera_object and camera_object.type == 'CAMERA':
+        camera_data = camera_object.data
+        state = {"matrix": camera_object.matrix_world.copy()}
+        for attr in ("type", "lens", "ortho_scale", "sensor_width", "sensor_fit",
+                     "shift_x", "shift_y", "clip_start", "clip_end"):
+            state[attr] = getattr(camera_data, attr)
+        return state
+    
+    return view_state_from_matrix(region_3d.view_matrix, space.lens, region_3d.view_perspective == 'ORTHO',
+                                  region_3d.view_distance, space.clip_start, space.clip_end)
+
+def apply_view_state(camera_object, state):
+    """Copy a captured view state onto a camera object and its data"""
+    camera_object.matrix_world = state["matrix"]
+    camera_data = camera_object.data
+    for attr, value in state.items():
+        if attr != "matrix":
+            setattr(camera_data, attr, value)
+
+def create_cameras_from_states(collection, names, states):
+    """Create one camera per view state, all linked to collection"""
+    cameras = []
+    for name, state in zip(names, states):
+        camera_object = create_camera_from_matrix(collection, name, state["matrix"])
+        apply_view_state(camera_object, state)
+        cameras.append(camera_object)
+    return cameras
+
+def select_objects(view_layer, objects):
+    """Select exactly objects, touching only what is selected instead of the whole scene"""
+    for obj in view_layer.objects.selected:
+        obj.select_set(False, view_layer=view_layer)
+    for obj in objects:
+        obj.select_set(True, view_layer=view_layer)
+    if objects:
+        view_layer.objects.active = objects[-1]
+
+class VERTEXLAB_PG_view_bookmark(bpy.types.PropertyGroup):
+    """A captured view stored as plain values, without a camera object"""
+    # World matrix, row-major
+    matrix: bpy.props.FloatVectorProperty(
+        name="Matrix",
+        size=16,
+        default=tuple(value for row in Matrix.Identity(4) for value in row),
+    )
+    lens: bpy.props.FloatProperty(name="Focal Length", default=50.0, min=1.0)
+    ortho: bpy.props.BoolProperty(name="Orthographic", default=False)
+    ortho_scale: bpy.props.FloatProperty(name="Orthographic Scale", default=6.0, min=0.001)
+    clip_start: bpy.props.FloatProperty(name="Clip Start", default=0.1, min=1e-6)
+    clip_end: bpy.props.FloatProperty(name="Clip End", default=1000.0, min=1e-6)
+    use_dof: bpy.props.BoolProperty(name="Depth of Field", default=False)
+    focus_distance: bpy.props.FloatProperty(name="Focus Distance", default=10.0, min=0.0)
+    aperture_fstop: bpy.props.FloatProperty(name="F-Stop", default=2.8, min=0.1)
+
+def capture_bookmark(bookmark, scene, space, region_3d):
+    """Store the viewport view (or the scene camera when looking through it) in bookmark"""
+    state = capture_view_state(region_3d, space, scene)
+    bookmark.lens = state["lens"]
+    bookmark.ortho = state["type"] == 'ORTHO'
+    bookmark.ortho_scale = state["ortho_scale"]
+    bookmark.clip_start = state["clip_start"]
+    bookmark.clip_end = state["clip_end"]
+    bookmark.matrix = [value for row in state["matrix"] for value in row]
+    
+    # Depth of field comes from whichever camera is in use; the viewport has none
+    camera_object = scene.camera
+    if camera_object and camera_object.type == 'CAMERA':
+        dof = camera_object.data.dof
+        bookmark.use_dof = dof.use_dof
+        bookmark.focus_distance = dof.focus_distance
+        bookmark.aperture_fstop = dof.aperture_fstop
+
+def apply_bookmark(bookmark, camera_object):
+    """Copy a bookmark's transform, lens, clipping and depth of field onto a camera"""
+    camera_object.matrix_world = bookmark_matrix(bookmark)
+    
+    camera_data = camera_object.data
+    camera_data.type = 'ORTHO' if bookmark.ortho else 'PERSP'
+    camera_data.lens = bookmark.lens
+    camera_data.ortho_scale = bookmark.ortho_scale
+    camera_data.clip_start = bookmark.clip_start
+    camera_data.clip_end = bookmark.clip_end
+    camera_data.dof.use_dof = bookmark.use_dof
+    camera_data.dof.focus_distance = bookmark.focus_distance
+    camera_data.dof.aperture_fstop = bookmark.aperture_fstop
+
+def get_bookmark_camera(scene):
+    """Return the scene's reusable bookmark camera, creating it on first use"""
+    camera_object = scene.vertexlab_bookmark_camera
+    if camera_object is None or camera_object.type != 'CAMERA':
+        camera_object = create_camera_from_matrix(scene.collection, BOOKMARK_CAMERA_NAME, Matrix.Identity(4))
+        scene.vertexlab_bookmark_camera = camera_object
+    return camera_object
+
+@profiled_update
+def update_active_bookmark(self, context):
+    """Switch the reusable camera to the bookmark selected in the list"""
+    scene = self
+    if 0 <= scene.vertexlab_active_bookmark < len(scene.vertexlab_bookmarks):
+        camera_object = get_bookmark_camera(scene)
+        apply_bookmark(scene.vertexlab_bookmarks[scene.vertexlab_active_bookmark], camera_object)
+        scene.camera = camera_object
+
+def bookmark_matrix(bookmark):
+    """Return a bookmark's stored world matrix"""
+    values = bookmark.matrix
+    return Matrix([values[0:4], values[4:8], values[8:12], values[12:16]])
+
+def interpolate_views(matrices, lenses, frames_per_view, ease=True):
+    """Return per-frame (location, euler, lens) samples through the views
+    
+    Locations and focal lengths are blended linearly and rotations with
+    quaternion slerp; every quaternion is flipped to the same hemisphere as
+    the previous one so the path never takes the long way round.
+    """
+    locations = []
+    rotations = []
+    for matrix in matrices:
+        location, rotation, _scale = matrix.decompose()
+        if rotations:
+            rotation.make_compatible(rotations[-1])
+        locations.append(location)
+        rotations.append(rotation)
+    
+    samples = []
+    euler = None
+    for index in range(len(matrices) - 1):
+        for step in range(frames_per_view):
+            factor = step / frames_per_view
+            if ease:
+                factor = factor * factor * (3.0 - 2.0 * factor)
+            
+            rotation = rotations[index].slerp(rotations[index + 1], factor)
+            # Pass the previous euler so angles stay continuous across +-180 degrees
+            euler = rotation.to_euler('XYZ', euler) if euler else rotation.to_euler('XYZ')
+            samples.append((
+                locations[index].lerp(locations[index + 1], factor),
+                euler,
+                lenses[index] + (lenses[index + 1] - lenses[index]) * factor,
+            ))
+    
+    last = rotations[-1].to_euler('XYZ', euler) if euler else rotations[-1].to_euler('XYZ')
+    samples.append((locations[-1], last, lenses[-1]))
+    return samples
+
+def bake_channels(id_data, channels, frame_start):
+    """Write per-frame values into F-curves with one foreach_set per channel
+    
+    channels is a list of (data_path, index, values); values[0] lands on frame_start.
+    """
+    animation_data = id_data.animation_data or id_data.animation_data_create()
+    action = animation_data.action
+    if action is None:
+        action = bpy.data.actions.new(name=f"{id_data.name}Action")
+        animation_data.action = action
+    linear = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items["LINEAR"].value
+    
+    for data_path, index, values in channels:
+        # Blender 4.4+ layered actions need the F-curve created for the datablock's slot
+        if hasattr(action, "fcurve_ensure_for_datablock"):
+            fcurve = action.fcurve_ensure_for_datablock(id_data, data_path, index=index)
+        else:
+            fcurve = action.fcurves.find(data_path, index=index) or action.fcurves.new(data_path, index=index)
+        
+        keyframes = fcurve.keyframe_points
+        keyframes.add(len(values))
+        keyframes.foreach_set("co", [v for frame, value in enumerate(values, frame_start) for v in (frame, value)])
+        keyframes.foreach_set("interpolation", [linear] * len(values))
+        fcurve.update()
+
+def create_camera_path(context, matrices, lenses, frames_per_view, ease=True):
+    """Create one camera animated through the given views, baked to keyframes"""
+    scene = context.scene
+    samples = interpolate_views(matrices, lenses, frames_per_view, ease)
+    
+    prefix, padding = get_naming_settings(context)
+    name = allocate_camera_names(scene, 1, prefix, padding)[0]
+    camera_object = create_camera_from_matrix(context.collection, name, matrices[0])
+    camera_object.rotation_mode = 'XYZ'
+    
+    frame_start = scene.frame_start
+    channels = [("location", axis, [sample[0][axis] for sample in samples]) for axis in range(3)]
+    channels += [("rotation_euler", axis, [sample[1][axis] for sample in samples]) for axis in range(3)]
+    bake_channels(camera_object, channels, frame_start)
+    
+    # Only animate the focal length when the views actually differ
+    if max(lenses) - min(lenses) > 1e-6:
+        bake_channels(camera_object.data, [("lens", 0, [sample[2] for sample in samples])], frame_start)
+    else:
+        camera_object.data.lens = lenses[0]
+    
+    return camera_object, frame_start + len(samples) - 1
+
+def promote_bookmarks(context, bookmarks):
+    """Create one real CAM_### camera per bookmark, reserving all names in a single pass"""
+    prefix, padding = get_naming_settings(context)
+    names = allocate_camera_names(context.scene, len(bookmarks), prefix, padding)
+    
+    cameras = []
+    for name, bookmark in zip(names, bookmarks):
+        camera_object = create_camera_from_matrix(context.collection, name, Matrix.Identity(4))
+        apply_bookmark(bookmark, camera_object)
+        cameras.append(camera_object)
+    return cameras
+
 class VERTEXLAB_OT_camera_from_view(bpy.types.Operator):
     """Create a camera perfectly aligned with the current viewport view"""
     bl_idname = "vertexlab.camera_from_view"
     bl_label = "Camera From View"
     bl_options = {'REGISTER', 'UNDO'}
 
+    @classmethod
+    def poll(cls, context):
+        return context.space_data is not None and context.space_data.type == 'VIEW_3D'
+    
     def execute(self, context):
-        # Capture the current viewport state
-        region_3d = context.space_data.region_3d
-        view_matrix = region_3d.view_matrix.copy()
+        # Capture the current viewport state: transform, lens, ortho scale and clipping
+        space = context.space_data
+        state = capture_view_state(space.region_3d, space, context.scene)
 
         # Generate a unique camera name
-        camera_name = self.get_unique_camera_name()
+        prefix, padding = get_naming_settings(context)
+        camera_name = allocate_camera_names(context.scene, 1, prefix, padding)[0]
         
-        # Create camera with the appropriate settings
-        camera_data = bpy.data.cameras.new(name=camera_name)
-        camera_object = bpy.data.objects.new(name=camera_name, object_data=camera_data)
-        
-        # Link the camera to the active collection
-        context.collection.objects.link(camera_object)
-
-        # Position and orient the camera to match current view
-        camera_object.matrix_world = view_matrix.inverted()
+        # Create the camera in the active collection, matching the current view
+        camera_object = create_cameras_from_states(context.collection, [camera_name], [state])[0]
         
         # Make this the active camera for the scene
         context.scene.camera = camera_object
 
         # Select and make camera the active object
-        bpy.ops.object.select_all(action='DESELECT')
-        camera_object.select_set(True)
-        context.view_layer.objects.active = camera_object
+        select_objects(context.view_layer, [camera_object])
         
         self.report({'INFO'}, f"Camera '{camera_name}' created from current view")
         return {'FINISHED'}
 
-    def get_unique_camera_name(self):
-        """Generate a unique and professional camera name"""
-        existing_cameras = [obj.name for obj in bpy.data.objects if obj.type == 'CAMERA']
+class VERTEXLAB_OT_cameras_from_all_views(bpy.types.Operator):
+    """Create one camera for every 3D viewport open in the current screen"""
+    bl_idname = "vertexlab.cameras_from_all_views"
+    bl_label = "Cameras From All Views"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return context.screen is not None
+    
+    def execute(self, context):
+        # Collect the view of every 3D viewport in the screen
+        states = [
+            capture_view_state(area.spaces.active.region_3d, area.spaces.active, context.scene)
+            for area in context.screen.areas
+            if area.type == 'VIEW_3D'
+        ]
+        if not states:
+            self.report({'WARNING'}, "No 3D viewports found")
+            return {'CANCELLED'}
+        
+        # Reserve all names at once instead of searching per camera
+        prefix, padding = get_naming_settings(context)
+        names = allocate_camera_names(context.scene, len(states), prefix, padding)
         
-        # Format: CAM_001, CAM_002, etc.
-        index = 1
-        while True:
-            padded_index = str(index).zfill(3)
-            name = f"CAM_{padded_index}"
-            if name not in existing_cameras:
-                return name
-            index += 1
+        cameras = create_cameras_from_states(context.collection, names, states)
+        select_objects(context.view_layer, cameras)
+        
+        self.report({'INFO'}, f"Created {len(cameras)} cameras from viewports")
+        return {'FINISHED'}
+
+class VERTEXLAB_OT_add_view_bookmark(bpy.types.Operator):
+    """Store the current view as a bookmark instead of creating a camera"""
+    bl_idname = "vertexlab.add_view_bookmark"
+    bl_label = "Add View Bookmark"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return context.space_data is not None and context.space_data.type == 'VIEW_3D'
+    
+    def execute(self, context):
+        scene = context.scene
+        bookmarks = scene.vertexlab_bookmarks
+        bookmark = bookmarks.add()
+        bookmark.name = f"View {len(bookmarks)}"
+        capture_bookmark(bookmark, scene, context.space_data, context.space_data.region_3d)
+        
+        # Selecting the new entry applies it to the bookmark camera
+        scene.vertexlab_active_bookmark = len(bookmarks) - 1
+        return {'FINISHED'}
+
+class VERTEXLAB_OT_remove_view_bookmark(bpy.types.Operator):
+    """Delete the selected view bookmark"""
+    bl_idname = "vertexlab.remove_view_bookmark"
+    bl_label = "Remove View Bookmark"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.vertexlab_bookmarks) > 0
+    
+    def execute(self, context):
+        scene = context.scene
+        scene.vertexlab_bookmarks.remove(scene.vertexlab_active_bookmark)
+        scene.vertexlab_active_bookmark = min(scene.vertexlab_active_bookmark, len(scene.vertexlab_bookmarks) - 1)
+        return {'FINISHED'}
+
+class VERTEXLAB_OT_promote_view_bookmarks(bpy.types.Operator):
+    """Turn view bookmarks into real cameras"""
+    bl_idname = "vertexlab.promote_view_bookmarks"
+    bl_label = "Promote Bookmarks"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    promote_all: bpy.props.BoolProperty(
+        name="All Bookmarks",
+        description="Promote every bookmark instead of only the selected one",
+        default=False,
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return len(context.scene.vertexlab_bookmarks) > 0
+    
+    def execute(self, context):
+        scene = context.scene
+        if self.promote_all:
+            bookmarks = list(scene.vertexlab_bookmarks)
+        elif 0 <= scene.vertexlab_active_bookmark < len(scene.vertexlab_bookmarks):
+            bookmarks = [scene.vertexlab_bookmarks[scene.vertexlab_active_bookmark]]
+        else:
+            self.report({'WARNING'}, "No bookmark selected")
+            return {'CANCELLED'}
+        
+        cameras = promote_bookmarks(context, bookmarks)
+        select_objects(context.view_layer, cameras)
+        
+        self.report({'INFO'}, f"Promoted {len(cameras)} bookmarks to cameras")
+        return {'FINISHED'}
+
+class VERTEXLAB_OT_camera_path_from_views(bpy.types.Operator):
+    """Create one camera that flies through view bookmarks or selected cameras"""
+    bl_idname = "vertexlab.camera_path_from_views"
+    bl_label = "Camera Path From Views"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    source: bpy.props.EnumProperty(
+        name="Views",
+        items=[
+            ('BOOKMARKS', "View Bookmarks", "Every view bookmark of the scene, in list order"),
+            ('CAMERAS', "Selected Cameras", "Selected cameras, ordered by name (CAM_001, CAM_002, ...)"),
+        ],
+        default='BOOKMARKS',
+    )
+    frames_per_view: bpy.props.IntProperty(
+        name="Frames per View",
+        description="Frames spent travelling from one view to the next",
+        default=48,
+        min=1,
+    )
+    ease: bpy.props.BoolProperty(
+        name="Ease",
+        description="Slow down into and out of every view",
+        default=True,
+    )
+    set_frame_range: bpy.props.BoolProperty(
+        name="Set Frame Range",
+        description="Fit the scene frame range to the path",
+        default=True,
+    )
+    
+    def execute(self, context):
+        scene = context.scene
+        if self.source == 'BOOKMARKS':
+            views = [(bookmark_matrix(bookmark), bookmark.lens) for bookmark in scene.vertexlab_bookmarks]
+        else:
+            cameras = sorted((obj for obj in context.selected_objects if obj.type == 'CAMERA'), key=lambda obj: obj.name)
+            views = [(obj.matrix_world.copy(), obj.data.lens) for obj in cameras]
+        
+        if len(views) < 2:
+            self.report({'WARNING'}, "At least two views are needed for a camera path")
+            return {'CANCELLED'}
+        
+        matrices, lenses = zip(*views)
+        camera_object, frame_end = create_camera_path(context, matrices, lenses, self.frames_per_view, self.ease)
+        if self.set_frame_range:
+            scene.frame_end = frame_end
+        scene.camera = camera_object
+        select_objects(context.view_layer, [camera_object])
+        
+        self.report({'INFO'}, f"Camera '{camera_object.name}' animated through {len(views)} views")
+        return {'FINISHED'}
+
+class VERTEXLAB_PT_view_bookmarks(bpy.types.Panel):
+    """Sidebar list of view bookmarks"""
+    bl_label = "View Bookmarks"
+    bl_idname = "VERTEXLAB_PT_view_bookmarks"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'View'
+    
+    def draw(self, context):
+        layout = self.layout
+        scene = context.scene
+        
+        row = layout.row()
+        row.template_list("UI_UL_list", "vertexlab_bookmarks", scene, "vertexlab_bookmarks",
+                          scene, "vertexlab_active_bookmark", rows=4)
+        col = row.column(align=True)
+        col.operator(VERTEXLAB_OT_add_view_bookmark.bl_idname, text="", icon='ADD')
+        col.operator(VERTEXLAB_OT_remove_view_bookmark.bl_idname, text="", icon='REMOVE')
+        
+        row = layout.row(align=True)
+        row.operator(VERTEXLAB_OT_promote_view_bookmarks.bl_idname, text="Promote", icon='OUTLINER_OB_CAMERA')
+        op = row.operator(VERTEXLAB_OT_promote_view_bookmarks.bl_idname, text="Promote All")
+        op.promote_all = True
+        layout.operator(VERTEXLAB_OT_camera_path_from_views.bl_idname, icon='ANIM')
 
 def menu_func_camera(self, context):
     """Add the operator to the Camera menu"""
     self.layout.operator(VERTEXLAB_OT_camera_from_view.bl_idname, 
                         text="Camera From View", 
                         icon='OUTLINER_OB_CAMERA')
+    self.layout.operator(VERTEXLAB_OT_cameras_from_all_views.bl_idname,
+                        text="Cameras From All Views",
+                        icon='OUTLINER_OB_CAMERA')
+
+classes = (
+    VERTEXLAB_AP_camera_from_view,
+    VERTEXLAB_PG_view_bookmark,
+    VERTEXLAB_OT_camera_from_view,
+    VERTEXLAB_OT_cameras_from_all_views,
+    VERTEXLAB_OT_add_view_bookmark,
+    VERTEXLAB_OT_remove_view_bookmark,
+    VERTEXLAB_OT_promote_view_bookmarks,
+    VERTEXLAB_OT_camera_path_from_views,
+    VERTEXLAB_PT_view_bookmarks,
+)
 
 def register():
-    bpy.utils.register_class(VERTEXLAB_OT_camera_from_view)
+    for cls in classes:
+        bpy.utils.register_class(cls)
     bpy.types.VIEW3D_MT_camera_add.append(menu_func_camera)
     
+    bpy.types.Scene.vertexlab_bookmarks = bpy.props.CollectionProperty(type=VERTEXLAB_PG_view_bookmark)
+    bpy.types.Scene.vertexlab_active_bookmark = bpy.props.IntProperty(
+        name="Active Bookmark",
+        default=0,
+        update=update_active_bookmark,
+    )
+    bpy.types.Scene.vertexlab_bookmark_camera = bpy.props.PointerProperty(
+        name="Bookmark Camera",
+        description="Camera reused to look through view bookmarks",
+        type=bpy.types.Object,
+    )
+    
     # Register keyboard shortcut
     wm = bpy.context.window_manager
     kc = wm.keyconfigs.addon
@@ -99,7 +620,13 @@ def unregister():
                     break
     
     bpy.types.VIEW3D_MT_camera_add.remove(menu_func_camera)
-    bpy.utils.unregister_class(VERTEXLAB_OT_camera_from_view)
+    
+    del bpy.types.Scene.vertexlab_bookmarks
+    del bpy.types.Scene.vertexlab_active_bookmark
+    del bpy.types.Scene.vertexlab_bookmark_camera
+    
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
 
 if __name__ == "__main__":
     register()
\ No newline at end of file
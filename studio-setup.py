@@ -11,27 +11,232 @@ bl_info = {
 }
 
 import bpy
+import numpy as np
+import argparse
+import glob
+import gzip
+import hashlib
+import json
 import math
-from mathutils import Vector
+import os
+import subprocess
+import sys
+import time
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ExportHelper, ImportHelper
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from mathutils import Matrix, Vector
 
+def get_active_rig(scene):
+    rigs = scene.quickstudio_rigs
+    if 0 <= scene.quickstudio_active_rig < len(rigs):
+        return rigs[scene.quickstudio_active_rig]
+    return None
+
+# Opt-in callback profiler. Operators are only wrapped while it is enabled, by
+# swapping their execute methods, so a disabled profiler costs nothing there.
+# Update callbacks are bound at registration and keep a single flag check.
+PROFILED_OPERATOR_PREFIXES = ("QUICKSTUDIO_OT_", "VERTEXLAB_OT_")
+PROFILE_SAMPLES = 1000
+PROFILE_TRACE_EVENTS = 20000
+PROFILE_PANEL_ROWS = 8
+
+_profiler = {"enabled": False, "last": None, "originals": {}, "hooks": []}
+_profile_stats = {}
+_profile_events = deque(maxlen=PROFILE_TRACE_EVENTS)
+_profile_epoch = time.perf_counter()
+
+def record_profile(name, kind, start, elapsed):
+    stats = _profile_stats.get(name)
+    if stats is None:
+        stats = _profile_stats[name] = {
+            "kind": kind,
+            "count": 0,
+            "total": 0.0,
+            "samples": deque(maxlen=PROFILE_SAMPLES),
+            "depsgraph_updates": 0,
+        }
+    stats["count"] += 1
+    stats["total"] += elapsed
+    stats["samples"].append(elapsed)
+    _profile_events.append((name, kind, start, elapsed))
+    # The next depsgraph update is attributed to the callback that ran last.
+    _profiler["last"] = name
+
+def profile_p95(stats):
+    return float(np.percentile(stats["samples"], 95)) if stats["samples"] else 0.0
+
+def run_profiled_update(name, func, self, context):
+    start = time.perf_counter()
+    try:
+        return func(self, context)
+    finally:
+        record_profile(name, "update", start, time.perf_counter() - start)
+
+def profiled_update(func):
+    name = func.__name__
+    
+    def wrapper(self, context):
+        if not _profiler["enabled"]:
+            return func(self, context)
+        return run_profiled_update(name, func, self, context)
+    
+    wrapper.__name__ = name
+    return wrapper
+
+def profiled_execute(name, execute):
+    def wrapper(self, context):
+        start = time.perf_counter()
+        try:
+            return execute(self, context)
+        finally:
+            record_profile(name, "operator", start, time.perf_counter() - start)
+    
+    return wrapper
+
+def enable_profiler():
+    if _profiler["enabled"]:
+        return
+    
+    # Registered operators of both add-ons, including camera.py when it is enabled.
+    for cls in bpy.types.Operator.__subclasses__():
+        if cls.__name__.startswith(PROFILED_OPERATOR_PREFIXES) and "execute" in cls.__dict__:
+            execute = cls.__dict__["execute"]
+            _profiler["originals"][cls] = execute
+            cls.execute = profiled_execute(cls.__name__, execute)
+            # camera.py binds its update callbacks at registration; they call back through its hook.
+            hook = getattr(sys.modules.get(cls.__module__), "_profile_hook", None)
+            if isinstance(hook, dict) and hook not in _profiler["hooks"]:
+                hook["update"] = run_profiled_update
+                _profiler["hooks"].append(hook)
+    _profiler["enabled"] = True
+
+def disable_profiler():
+    for cls, execute in _profiler["originals"].items():
+        cls.execute = execute
+    _profiler["originals"].clear()
+    for hook in _profiler["hooks"]:
+        hook["update"] = None
+    _profiler["hooks"].clear()
+    _profiler["enabled"] = False
+    _profiler["last"] = None
+
+def reset_profile():
+    _profile_stats.clear()
+    _profile_events.clear()
+    _profiler["last"] = None
+
+def update_profile_callbacks(self, context):
+    if self.quickstudio_profile_callbacks:
+        enable_profiler()
+    else:
+        disable_profiler()
+
+def export_profile(path, file_format):
+    if file_format == 'TRACE':
+        # Chrome trace event format, viewable in chrome://tracing or Perfetto.
+        data = {
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": kind,
+                    "ph": "X",
+                    "ts": (start - _profile_epoch) * 1e6,
+                    "dur": elapsed * 1e6,
+                    "pid": 1,
+                    "tid": 1,
+                }
+                for name, kind, start, elapsed in _profile_events
+            ],
+            "displayTimeUnit": "ms",
+        }
+    else:
+        data = {
+            name: {
+                "kind": stats["kind"],
+                "count": stats["count"],
+                "total_ms": stats["total"] * 1000.0,
+                "mean_ms": stats["total"] / stats["count"] * 1000.0,
+                "p95_ms": profile_p95(stats) * 1000.0,
+                "depsgraph_updates": stats["depsgraph_updates"],
+            }
+            for name, stats in _profile_stats.items()
+        }
+    
+    with open(path, "w") as f:
+        json.dump(data, f, indent=1)
+    return len(data["traceEvents"]) if file_format == 'TRACE' else len(data)
+
+# Counts of the constraint and object edits made by the add-on's own helpers.
+# These are not relations rebuilds: Blender rebuilds relations after any of
+# them, a retarget included, and Python cannot observe the rebuilds.
+# 'skipped' counts target writes avoided because nothing changed, the only
+# case that saves a rebuild.
+_rig_edits = {
+    "constraints_added": 0,
+    "constraints_removed": 0,
+    "retargets": 0,
+    "skipped": 0,
+    "objects_added": 0,
+    "objects_removed": 0,
+}
+
+def get_rig_edits():
+    return dict(_rig_edits)
+
+def ensure_constraint(obj, constraint_type, create=True):
+    found = None
+    duplicates = []
+    for constraint in obj.constraints:
+        if constraint.type == constraint_type:
+            if found is None:
+                found = constraint
+            else:
+                duplicates.append(constraint)
+    
+    # Removed after the scan so the loop above never skips entries.
+    for constraint in duplicates:
+        obj.constraints.remove(constraint)
+        _rig_edits["constraints_removed"] += 1
+    
+    if found is None and create:
+        found = obj.constraints.new(type=constraint_type)
+        _rig_edits["constraints_added"] += 1
+    return found
+
+def retarget_constraint(constraint, target):
+    mute = target is None
+    if constraint.target == target and constraint.mute == mute:
+        _rig_edits["skipped"] += 1
+        return False
+    
+    constraint.target = target
+    constraint.mute = mute
+    _rig_edits["retargets"] += 1
+    return True
+
+def set_camera_track_target(cam, target):
+    constraint = ensure_constraint(cam, 'TRACK_TO', create=target is not None)
+    if constraint is None:
+        return
+    
+    retarget_constraint(constraint, target)
+    if constraint.track_axis != 'TRACK_NEGATIVE_Z':
+        constraint.track_axis = 'TRACK_NEGATIVE_Z'
+    if constraint.up_axis != 'UP_Y':
+        constraint.up_axis = 'UP_Y'
+
+@profiled_update
 def update_camera_track_toggle(self, context):
-    if "CAM1" in bpy.data.objects:
-        cam = bpy.data.objects["CAM1"]
-        use_track = context.scene.quickstudio_use_camera_track
-        
-        if use_track:
-            context.scene.quickstudio_camera_target = None
-        
-        for constraint in cam.constraints:
-            if constraint.type == 'TRACK_TO':
-                cam.constraints.remove(constraint)
-        
-        if use_track:
-            if "CAM1 TRACK" not in bpy.data.objects:
-                if "STUDIO" in bpy.data.collections:
-                    studio_coll = bpy.data.collections["STUDIO"]
-                else:
-                    studio_coll = bpy.context.scene.collection
+    cam = self.camera
+    if cam:
+        if self.use_camera_track:
+            self.camera_target = None
+            
+            cam_track = self.camera_track
+            if cam_track is None:
+                studio_coll = self.collection or context.scene.collection
                 
                 cam_track = bpy.data.objects.new("CAM1 TRACK", None)
                 cam_track.empty_display_type = 'SPHERE'
@@ -40,97 +245,564 @@ def update_camera_track_toggle(self, context):
                 cam_track.location = (0, 0, 0)
                 cam_track.color = (0, 0, 1, 1.0)
                 cam_track.show_name = True
-            else:
-                cam_track = bpy.data.objects["CAM1 TRACK"]
-                
-            constraint = cam.constraints.new(type='TRACK_TO')
-            constraint.target = cam_track
-            constraint.track_axis = 'TRACK_NEGATIVE_Z'
-            constraint.up_axis = 'UP_Y'
+                self.camera_track = cam_track
+                _rig_edits["objects_added"] += 1
+            elif cam_track.hide_viewport:
+                cam_track.hide_viewport = False
+            
+            set_camera_track_target(cam, cam_track)
         else:
-            if "CAM1 TRACK" in bpy.data.objects:
-                track_obj = bpy.data.objects["CAM1 TRACK"]
-                bpy.data.objects.remove(track_obj, do_unlink=True)
+            # Keep the track empty around hidden, so toggling back reuses it.
+            if self.camera_track and not self.camera_track.hide_viewport:
+                self.camera_track.hide_viewport = True
             
-            target = context.scene.quickstudio_camera_target
-            if target:
-                constraint = cam.constraints.new(type='TRACK_TO')
-                constraint.target = target
-                constraint.track_axis = 'TRACK_NEGATIVE_Z'
-                constraint.up_axis = 'UP_Y'
+            set_camera_track_target(cam, self.camera_target)
 
+@profiled_update
 def update_camera_target(self, context):
-    if "CAM1" in bpy.data.objects and not context.scene.quickstudio_use_camera_track:
-        cam = bpy.data.objects["CAM1"]
-        target = context.scene.quickstudio_camera_target
-        
-        for constraint in cam.constraints:
-            if constraint.type == 'TRACK_TO':
-                cam.constraints.remove(constraint)
+    cam = self.camera
+    if cam and not self.use_camera_track:
+        set_camera_track_target(cam, self.camera_target)
         
-        if target is not None:
-            constraint = cam.constraints.new(type='TRACK_TO')
-            constraint.target = target
-            constraint.track_axis = 'TRACK_NEGATIVE_Z'
-            constraint.up_axis = 'UP_Y'
+        if self.auto_frame:
+            frame_rig_to_targets(context, self)
 
+@profiled_update
 def update_light_target(self, context):
-    lights_control = bpy.data.objects.get("LIGHTS CONTROL")
+    lights_control = self.lights_control
     if not lights_control:
         return
-        
-    target = context.scene.quickstudio_light_target
     
-    for light_name in ["Key Light", "Fill Light", "Rim Light", "Back Light"]:
-        light = bpy.data.objects.get(light_name)
+    target = self.light_target or lights_control
+    
+    for item in self.lights:
+        light = item.object
         if not light:
             continue
-            
-        for constraint in light.constraints:
-            if constraint.type == 'CHILD_OF':
-                light.constraints.remove(constraint)
-                
-        if target is not None:
-            constraint = light.constraints.new(type='CHILD_OF')
-            constraint.target = target
+        
+        constraint = ensure_constraint(light, 'CHILD_OF', create=False)
+        if constraint is None:
+            constraint = ensure_constraint(light, 'CHILD_OF')
             constraint.influence = 0.5
-        else:
-            if lights_control:
-                constraint = light.constraints.new(type='CHILD_OF')
-                constraint.target = lights_control
-                constraint.influence = 0.5
+        retarget_constraint(constraint, target)
+    
+    if self.auto_frame:
+        frame_rig_to_targets(context, self)
 
+@profiled_update
+def update_auto_frame(self, context):
+    if self.auto_frame:
+        frame_rig_to_targets(context, self)
+
+@profiled_update
 def update_dof_target(self, context):
-    if "CAM1" in bpy.data.objects:
-        cam = bpy.data.objects["CAM1"]
-        use_target = context.scene.quickstudio_dof_use_target
-        target = context.scene.quickstudio_dof_target
-        
-        if use_target and target:
-            cam.data.dof.focus_object = target
+    cam = self.camera
+    if cam:
+        if self.dof_use_target and self.dof_target:
+            cam.data.dof.focus_object = self.dof_target
         else:
             cam.data.dof.focus_object = None
 
+@profiled_update
 def update_background_color(self, context):
-    world = context.scene.world
-    if world:
-        world.use_nodes = True
-        if "Background" in world.node_tree.nodes:
-            bg_node = world.node_tree.nodes["Background"]
-            if context.scene.quickstudio_bg_transparent:
-                context.scene.render.film_transparent = True
-            else:
-                context.scene.render.film_transparent = False
-                bg_node.inputs[0].default_value = (
-                    context.scene.quickstudio_bg_color[0],
-                    context.scene.quickstudio_bg_color[1],
-                    context.scene.quickstudio_bg_color[2],
-                    1.0
-                )
+    apply_world_background(context.scene)
 
+@profiled_update
 def update_background_transparent(self, context):
-    update_background_color(self, context)
+    # Not through update_background_color, which would be recorded a second time.
+    apply_world_background(context.scene)
+
+# Width of the preview versions of HDRIs shown in the viewport.
+HDRI_PROXY_WIDTH = 1024
+
+# Full-resolution HDRI path -> name of its proxy image. Names rather than
+# images are kept, so undo or file loading cannot leave dangling references.
+_hdri_proxies = {}
+
+def get_hdri_cache_dir():
+    return bpy.utils.user_resource('CONFIG', path=os.path.join("quickstudio", "hdri_cache"), create=True)
+
+def hdri_proxy_path(path):
+    # Keyed by path, modification time, size and proxy width, so edited files get a new proxy.
+    stat = os.stat(path)
+    key = hashlib.sha1(f"{path}|{stat.st_mtime_ns}|{stat.st_size}|{HDRI_PROXY_WIDTH}".encode()).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(get_hdri_cache_dir(), f"{stem}_{key}.hdr")
+
+def load_hdri_proxy(path):
+    # Memory first, then the disk cache; the full image is read only to build a missing proxy.
+    image = bpy.data.images.get(_hdri_proxies.get(path, ""))
+    if image is not None:
+        return image
+    
+    proxy_path = hdri_proxy_path(path)
+    if not os.path.exists(proxy_path):
+        full = bpy.data.images.load(path, check_existing=True)
+        width, height = full.size
+        if width <= HDRI_PROXY_WIDTH:
+            _hdri_proxies[path] = full.name
+            return full
+        
+        proxy = full.copy()
+        proxy.scale(HDRI_PROXY_WIDTH, max(1, height * HDRI_PROXY_WIDTH // width))
+        proxy.filepath_raw = proxy_path
+        proxy.file_format = 'HDR'
+        proxy.save()
+        bpy.data.images.remove(proxy)
+        if full.users == 0:
+            bpy.data.images.remove(full)
+    
+    image = bpy.data.images.load(proxy_path, check_existing=True)
+    _hdri_proxies[path] = image.name
+    return image
+
+def ensure_world_node(nodes, name, node_type, location):
+    node = nodes.get(name)
+    if node is None:
+        node = nodes.new(node_type)
+        node.name = name
+        node.label = name[len("QS "):]
+        node.location = location
+    return node
+
+def apply_world_background(scene):
+    world = scene.world
+    if world is None:
+        return
+    world.use_nodes = True
+    nodes = world.node_tree.nodes
+    links = world.node_tree.links
+    bg_node = nodes.get("Background")
+    if bg_node is None:
+        return
+    
+    scene.render.film_transparent = scene.quickstudio_bg_transparent
+    color_input = bg_node.inputs[0]
+    # Only unplug what this add-on plugged in; a user's own texture setup stays.
+    for link in list(color_input.links):
+        if link.from_node.name.startswith("QS "):
+            links.remove(link)
     
+    mode = scene.quickstudio_bg_mode
+    if mode == 'HDRI':
+        path = bpy.path.abspath(scene.quickstudio_hdri_path)
+        if os.path.isfile(path):
+            coords = ensure_world_node(nodes, "QS Coordinates", 'ShaderNodeTexCoord', (-900, 300))
+            mapping = ensure_world_node(nodes, "QS Mapping", 'ShaderNodeMapping', (-700, 300))
+            environment = ensure_world_node(nodes, "QS Environment", 'ShaderNodeTexEnvironment', (-400, 300))
+            links.new(coords.outputs["Generated"], mapping.inputs["Vector"])
+            links.new(mapping.outputs["Vector"], environment.inputs["Vector"])
+            links.new(environment.outputs["Color"], color_input)
+            mapping.inputs["Rotation"].default_value[2] = scene.quickstudio_hdri_rotation
+            environment.image = load_hdri_proxy(path)
+            bg_node.inputs[1].default_value = scene.quickstudio_hdri_strength
+            return
+    elif mode == 'GRADIENT':
+        coords = ensure_world_node(nodes, "QS Coordinates", 'ShaderNodeTexCoord', (-900, 300))
+        separate = ensure_world_node(nodes, "QS Height", 'ShaderNodeSeparateXYZ', (-700, 0))
+        map_range = ensure_world_node(nodes, "QS Horizon", 'ShaderNodeMapRange', (-500, 0))
+        ramp = ensure_world_node(nodes, "QS Gradient", 'ShaderNodeValToRGB', (-300, 0))
+        links.new(coords.outputs["Generated"], separate.inputs["Vector"])
+        links.new(separate.outputs["Z"], map_range.inputs["Value"])
+        links.new(map_range.outputs["Result"], ramp.inputs["Fac"])
+        links.new(ramp.outputs["Color"], color_input)
+        # Direction Z runs from -1 (straight down) to 1; blend from just below the horizon.
+        map_range.inputs["From Min"].default_value = -0.2
+        map_range.inputs["From Max"].default_value = 1.0
+        ramp.color_ramp.elements[0].color = (*scene.quickstudio_gradient_bottom, 1.0)
+        ramp.color_ramp.elements[-1].color = (*scene.quickstudio_gradient_top, 1.0)
+        bg_node.inputs[1].default_value = 1.0
+        return
+    
+    color_input.default_value = (*scene.quickstudio_bg_color, 1.0)
+    bg_node.inputs[1].default_value = 1.0
+
+def set_world_hdri_resolution(scene, full):
+    # Renders get the full-resolution HDRI, the viewport keeps the proxy.
+    if scene.quickstudio_bg_mode != 'HDRI' or scene.world is None or not scene.world.node_tree:
+        return
+    environment = scene.world.node_tree.nodes.get("QS Environment")
+    path = bpy.path.abspath(scene.quickstudio_hdri_path)
+    if environment is None or not os.path.isfile(path):
+        return
+    
+    image = bpy.data.images.load(path, check_existing=True) if full else load_hdri_proxy(path)
+    if environment.image != image:
+        environment.image = image
+
+# Draw data derived from the active rig, keyed by scene pointer. Only strings and
+# indices are stored so a stale entry can never reference freed datablocks.
+_rig_state_cache = {}
+
+_redraw_stats = {"count": 0, "total": 0.0, "last": 0.0}
+
+def invalidate_rig_state():
+    _rig_state_cache.clear()
+
+def resolve_rig_state(scene, rig):
+    lights_control = rig.lights_control
+    
+    group_lights = {}
+    for index, item in enumerate(rig.lights):
+        group_lights.setdefault(item.group or item.name, []).append(index)
+    
+    groups = []
+    for group_index, group in enumerate(rig.groups):
+        name = group.name
+        light_indices = tuple(group_lights.get(name, ()))
+        
+        energy_path = None
+        size_paths = None
+        if lights_control:
+            if f"{name}_Energy" in lights_control:
+                energy_path = f'["{name}_Energy"]'
+            if f"{name}_Size" in lights_control and f"{name}_SizeY" in lights_control:
+                size_paths = (f'["{name}_Size"]', f'["{name}_SizeY"]')
+        
+        label = f"{name} Light" if len(light_indices) == 1 else f"{name} ({len(light_indices)} lights)"
+        groups.append((group_index, label, energy_path, size_paths, light_indices))
+    
+    return tuple(groups)
+
+def get_rig_state(scene, rig):
+    key = (scene.as_pointer(), scene.quickstudio_active_rig, rig.name, len(rig.lights))
+    state = _rig_state_cache.get(key)
+    if state is None:
+        state = resolve_rig_state(scene, rig)
+        _rig_state_cache[key] = state
+    return state
+
+def record_redraw_time(elapsed):
+    _redraw_stats["count"] += 1
+    _redraw_stats["total"] += elapsed
+    _redraw_stats["last"] = elapsed
+
+def update_profile_redraw(self, context):
+    _redraw_stats.update(count=0, total=0.0, last=0.0)
+
+@profiled_update
+def update_control_mode(self, context):
+    lights_control = self.lights_control
+    if not lights_control:
+        return
+    
+    baked = self.control_mode == 'BAKED'
+    
+    for prefix, light in iter_rig_lights(self):
+        _baked_cache.pop(light.data.as_pointer(), None)
+        if baked:
+            remove_light_drivers(light)
+        else:
+            anim = light.data.animation_data
+            if anim is None or not anim.drivers:
+                setup_light_drivers(light, lights_control, prefix)
+    
+    if baked:
+        sync_baked_controls(self, force=True)
+
+# Object ray visibility flags exposed per light group.
+LIGHT_RAY_VISIBILITY = (
+    ("visible_camera", "Camera"),
+    ("visible_diffuse", "Diffuse"),
+    ("visible_glossy", "Glossy"),
+    ("visible_transmission", "Transmission"),
+    ("visible_volume_scatter", "Volume"),
+)
+
+# Set while a preset rewrites many group properties, so lights are written once.
+_light_settings_batch = {"active": False}
+
+def rig_from_group(group):
+    # 'quickstudio_rigs[0].groups[1]' -> the rig owning the group.
+    path = group.path_from_id()
+    return group.id_data.path_resolve(path.rsplit(".groups[", 1)[0])
+
+def set_if_changed(owner, attr, value):
+    if getattr(owner, attr) != value:
+        setattr(owner, attr, value)
+
+def write_light_settings(light, group, link_collection):
+    light_data = light.data
+    if hasattr(light_data, "use_shadow"):
+        set_if_changed(light_data, "use_shadow", group.cast_shadow)
+    
+    # Cycles settings moved between versions; only touch what exists.
+    cycles = getattr(light_data, "cycles", None)
+    if cycles is not None:
+        if hasattr(cycles, "cast_shadow"):
+            set_if_changed(cycles, "cast_shadow", group.cast_shadow)
+        if hasattr(cycles, "max_bounces"):
+            set_if_changed(cycles, "max_bounces", group.max_bounces)
+    
+    for attr, _label in LIGHT_RAY_VISIBILITY:
+        if hasattr(light, attr):
+            set_if_changed(light, attr, getattr(group, attr))
+    
+    # Light and shadow linking need Blender 4.0+.
+    linking = getattr(light, "light_linking", None)
+    if linking is not None:
+        receiver = link_collection if group.use_light_linking else None
+        blocker = link_collection if group.use_shadow_linking else None
+        if linking.receiver_collection != receiver:
+            linking.receiver_collection = receiver
+        if linking.blocker_collection != blocker:
+            linking.blocker_collection = blocker
+
+def apply_light_settings(rig, groups=None):
+    groups = {group.name: group for group in (rig.groups if groups is None else groups)}
+    count = 0
+    for group_name, light in iter_rig_lights(rig):
+        group = groups.get(group_name)
+        if group is not None:
+            write_light_settings(light, group, rig.link_collection)
+            count += 1
+    return count
+
+@profiled_update
+def update_group_light_settings(self, context):
+    if not _light_settings_batch["active"]:
+        apply_light_settings(rig_from_group(self), [self])
+
+@profiled_update
+def update_link_collection(self, context):
+    apply_light_settings(self)
+
+def normalize_rig_exposure(rig, depsgraph, evaluated=False):
+    # Inverse-square compensation per light group: energies follow the squared
+    # ratio of the group's mean light distance to its layout distance, and area
+    # sizes follow the radius of the targets. Each group remembers the factors
+    # already applied, so manual edits to the controls are kept relative.
+    lights_control = rig.lights_control
+    if not lights_control or not rig.groups:
+        return False
+    
+    group_index = {group.name: index for index, group in enumerate(rig.groups)}
+    rows = [(group_index[name], light) for name, light in iter_rig_lights(rig) if name in group_index]
+    if not rows:
+        return False
+    
+    group_count = len(rig.groups)
+    light_groups = np.fromiter((index for index, _light in rows), dtype=np.int64, count=len(rows))
+    if evaluated:
+        # World positions include the full LIGHTS CONTROL transform, rotation and scale too.
+        positions = np.array([light.evaluated_get(depsgraph).matrix_world.translation for _index, light in rows],
+                             dtype=np.float64)
+    else:
+        # Basis location plus the CHILD_OF offset, for lights moved since the last evaluation.
+        positions = np.array([light.location + light_parent_offset(light) for _index, light in rows], dtype=np.float64)
+    
+    targets = [obj for obj in (rig.light_target, rig.camera_target) if obj is not None]
+    bounds = combined_world_bounds(targets, depsgraph) if targets else None
+    if bounds is not None:
+        low, high = bounds
+        center = (low + high) / 2.0
+        radius_factor = max(float(np.linalg.norm(high - low)) / 2.0, 1e-3) / FRAME_REFERENCE_RADIUS
+    else:
+        center = np.array(lights_control.matrix_world.translation)
+        radius_factor = rig.frame_scale
+    
+    distances = np.linalg.norm(positions - center, axis=1)
+    counts = np.bincount(light_groups, minlength=group_count)
+    mean_distance = np.bincount(light_groups, weights=distances, minlength=group_count) / np.maximum(counts, 1)
+    
+    base_distance = np.array([group.base_distance for group in rig.groups])
+    applied_energy = np.array([group.energy_ratio for group in rig.groups])
+    applied_size = np.array([group.size_ratio for group in rig.groups])
+    energy_ratio = (mean_distance / np.maximum(base_distance, 1e-6)) ** 2
+    
+    # Groups from rigs built before normalization existed have no base distance.
+    changed = (counts > 0) & (base_distance > 0.0) & ~(
+        np.isclose(energy_ratio, applied_energy, rtol=1e-4) & np.isclose(radius_factor, applied_size, rtol=1e-4))
+    if not changed.any():
+        return False
+    
+    energy_scale = energy_ratio / applied_energy
+    size_scale = radius_factor / applied_size
+    for index in np.flatnonzero(changed).tolist():
+        group = rig.groups[index]
+        name = group.name
+        if f"{name}_Energy" in lights_control:
+            lights_control[f"{name}_Energy"] = lights_control[f"{name}_Energy"] * float(energy_scale[index])
+        for suffix in ("Size", "SizeY"):
+            if f"{name}_{suffix}" in lights_control:
+                lights_control[f"{name}_{suffix}"] = lights_control[f"{name}_{suffix}"] * float(size_scale[index])
+        group.energy_ratio = float(energy_ratio[index])
+        group.size_ratio = radius_factor
+    
+    lights_control.update_tag()
+    if rig.control_mode == 'BAKED':
+        sync_baked_controls(rig)
+    return True
+
+@profiled_update
+def update_normalize_exposure(self, context):
+    if self.normalize_exposure:
+        normalize_rig_exposure(self, context.evaluated_depsgraph_get(), evaluated=True)
+
+class QUICKSTUDIO_PG_rig_light(bpy.types.PropertyGroup):
+    object: bpy.props.PointerProperty(
+        name="Light",
+        type=bpy.types.Object
+    )
+    group: bpy.props.StringProperty(
+        name="Group",
+        description="Light group whose LIGHTS CONTROL values drive this light"
+    )
+
+class QUICKSTUDIO_PG_rig_group(bpy.types.PropertyGroup):
+    show_expanded: bpy.props.BoolProperty(
+        name="Show Settings",
+        default=False
+    )
+    page: bpy.props.IntProperty(
+        name="Page",
+        default=1,
+        min=1
+    )
+    cast_shadow: bpy.props.BoolProperty(
+        name="Cast Shadows",
+        default=True,
+        update=update_group_light_settings
+    )
+    max_bounces: bpy.props.IntProperty(
+        name="Max Bounces",
+        description="Maximum number of times light from this group bounces (Cycles)",
+        default=1024,
+        min=0,
+        max=1024,
+        update=update_group_light_settings
+    )
+    visible_camera: bpy.props.BoolProperty(name="Camera", default=True, update=update_group_light_settings)
+    visible_diffuse: bpy.props.BoolProperty(name="Diffuse", default=True, update=update_group_light_settings)
+    visible_glossy: bpy.props.BoolProperty(name="Glossy", default=True, update=update_group_light_settings)
+    visible_transmission: bpy.props.BoolProperty(name="Transmission", default=True, update=update_group_light_settings)
+    visible_volume_scatter: bpy.props.BoolProperty(name="Volume", default=True, update=update_group_light_settings)
+    use_light_linking: bpy.props.BoolProperty(
+        name="Light Linking",
+        description="Only light the rig's link collection",
+        default=False,
+        update=update_group_light_settings
+    )
+    use_shadow_linking: bpy.props.BoolProperty(
+        name="Shadow Linking",
+        description="Only the rig's link collection casts shadows from these lights",
+        default=False,
+        update=update_group_light_settings
+    )
+    base_distance: bpy.props.FloatProperty(
+        name="Base Distance",
+        description="Mean distance of the group's lights that its energy was designed for",
+        default=0.0,
+        min=0.0
+    )
+    energy_ratio: bpy.props.FloatProperty(
+        name="Applied Energy Factor",
+        default=1.0,
+        min=1e-9
+    )
+    size_ratio: bpy.props.FloatProperty(
+        name="Applied Size Factor",
+        default=1.0,
+        min=1e-9
+    )
+
+class QUICKSTUDIO_PG_rig(bpy.types.PropertyGroup):
+    collection: bpy.props.PointerProperty(
+        name="Collection",
+        type=bpy.types.Collection
+    )
+    camera: bpy.props.PointerProperty(
+        name="Camera",
+        type=bpy.types.Object
+    )
+    camera_track: bpy.props.PointerProperty(
+        name="Camera Track",
+        type=bpy.types.Object
+    )
+    lights_control: bpy.props.PointerProperty(
+        name="Lights Control",
+        type=bpy.types.Object
+    )
+    lights: bpy.props.CollectionProperty(
+        type=QUICKSTUDIO_PG_rig_light
+    )
+    groups: bpy.props.CollectionProperty(
+        type=QUICKSTUDIO_PG_rig_group
+    )
+    normalize_exposure: bpy.props.BoolProperty(
+        name="Normalize Exposure",
+        description="Scale light energies by the inverse square of their distance and area sizes by the "
+                    "target size, so the rig exposes the same at any scale",
+        default=False,
+        update=update_normalize_exposure
+    )
+    link_collection: bpy.props.PointerProperty(
+        name="Link Collection",
+        description="Collection the light and shadow linking of the rig lights is restricted to",
+        type=bpy.types.Collection,
+        update=update_link_collection
+    )
+    use_camera_track: bpy.props.BoolProperty(
+        name="Use Camera Track",
+        description="Create a null object to control the camera",
+        default=False,
+        update=update_camera_track_toggle
+    )
+    camera_target: bpy.props.PointerProperty(
+        name="Camera Target",
+        type=bpy.types.Object,
+        update=update_camera_target
+    )
+    light_target: bpy.props.PointerProperty(
+        name="Lights Target",
+        type=bpy.types.Object,
+        update=update_light_target
+    )
+    dof_target: bpy.props.PointerProperty(
+        name="Focus Object",
+        type=bpy.types.Object,
+        update=update_dof_target
+    )
+    dof_use_target: bpy.props.BoolProperty(
+        name="Use Target for DOF",
+        default=False,
+        update=update_dof_target
+    )
+    auto_frame: bpy.props.BoolProperty(
+        name="Auto Frame",
+        description="Fit camera and lights to the bounds of the camera and light targets",
+        default=False,
+        update=update_auto_frame
+    )
+    frame_margin: bpy.props.FloatProperty(
+        name="Frame Margin",
+        description="Extra room around the framed objects",
+        default=1.2,
+        min=1.0,
+        soft_max=3.0
+    )
+    frame_center: bpy.props.FloatVectorProperty(
+        name="Frame Center",
+        subtype='TRANSLATION',
+        size=3,
+        default=(0.0, 0.0, 0.0)
+    )
+    frame_scale: bpy.props.FloatProperty(
+        name="Frame Scale",
+        default=1.0,
+        min=1e-4
+    )
+    control_mode: bpy.props.EnumProperty(
+        name="Light Controls",
+        description="How LIGHTS CONTROL values reach the lights",
+        items=[
+            ('DRIVERS', "Drivers", "Drive each light from LIGHTS CONTROL"),
+            ('BAKED', "Baked", "Push LIGHTS CONTROL values to the lights only when they change"),
+        ],
+        default='DRIVERS',
+        update=update_control_mode
+    )
+
 class QUICKSTUDIO_PT_panel(bpy.types.Panel):
     bl_label = "Quick Studio Setup"
     bl_idname = "QUICKSTUDIO_PT_panel"
@@ -139,11 +811,71 @@ class QUICKSTUDIO_PT_panel(bpy.types.Panel):
     bl_category = 'QuickStudio'
 
     def draw(self, context):
+        if not context.scene.quickstudio_profile_redraw:
+            self.draw_studio(context)
+            return
+        
+        start = time.perf_counter()
+        self.draw_studio(context)
+        record_redraw_time(time.perf_counter() - start)
+        
+        count = _redraw_stats["count"]
+        col = self.layout.column(align=True)
+        col.label(text=f"Last redraw: {_redraw_stats['last'] * 1000.0:.3f} ms")
+        col.label(text=f"Average: {_redraw_stats['total'] / count * 1000.0:.3f} ms ({count} redraws)")
+        
+        edits = _rig_edits
+        col.label(text=f"Rig edits: {edits['constraints_added'] + edits['constraints_removed']} constraints, "
+                       f"{edits['objects_added'] + edits['objects_removed']} objects")
+        col.label(text=f"Retargets: {edits['retargets']} ({edits['skipped']} skipped)")
+    
+    def draw_studio(self, context):
         layout = self.layout
         
-        studio_exists = "STUDIO" in bpy.data.collections
+        if _async_build["steps"] is not None:
+            row = layout.row(align=True)
+            progress = _async_build["progress"]
+            if hasattr(row, "progress"):
+                row.progress(factor=progress, type='BAR', text=f"Building studio... {progress:.0%}")
+            else:
+                row.label(text=f"Building studio... {progress:.0%}", icon='TIME')
+            row.operator("quickstudio.cancel_build", text="", icon='CANCEL')
+            return
+        
+        # Build time and relations update of the last incremental build.
+        if _async_build["message"]:
+            layout.label(text=_async_build["message"], icon='INFO')
+        
+        rig = get_active_rig(context.scene)
+        
+        if context.scene.quickstudio_rigs:
+            row = layout.row()
+            row.template_list("UI_UL_list", "quickstudio_rigs", context.scene, "quickstudio_rigs",
+                              context.scene, "quickstudio_active_rig", rows=2)
+            col = row.column(align=True)
+            col.operator("quickstudio.create_studio", text="", icon='ADD')
+            col.operator("quickstudio.reset_studio", text="", icon='REMOVE')
+            col.operator("quickstudio.share_studio", text="", icon='LINKED')
+            
+            if rig is not None and rig.collection is not None and is_shared_studio(rig.collection):
+                row = layout.row(align=True)
+                if rig.collection.library is not None:
+                    row.label(text=f"Linked from {rig.collection.library.name}", icon='LINK_BLEND')
+                elif len(rig.collection.users_scene) > 1:
+                    row.label(text=f"Shared by {len(rig.collection.users_scene)} scenes", icon='LINKED')
+                else:
+                    row.label(text=f"Instanced {len(rig.collection.users_dupli_group)} times", icon='OUTLINER_OB_GROUP_INSTANCE')
+                row.operator("quickstudio.localize_studio", text="Make Local")
+        
+        row = layout.row(align=True)
+        row.prop(context.scene, "quickstudio_preset", text="Preset")
+        row.operator("quickstudio.save_preset", text="", icon='ADD')
+        row.operator("quickstudio.reload_presets", text="", icon='FILE_REFRESH')
+        row.operator("quickstudio.export_snapshot", text="", icon='EXPORT')
+        row.operator("quickstudio.import_snapshot", text="", icon='IMPORT')
+        row.operator("quickstudio.link_library_studio", text="", icon='LINK_BLEND')
         
-        if not studio_exists:
+        if rig is None:
             row = layout.row()
             row.scale_y = 2.0
             row.operator("quickstudio.create_studio", text="CREATE STUDIO")
@@ -151,8 +883,8 @@ class QUICKSTUDIO_PT_panel(bpy.types.Panel):
             box = layout.box()
             box.label(text="Camera Controls", icon='CAMERA_DATA')
             
-            if "CAM1" in bpy.data.objects:
-                cam = bpy.data.objects["CAM1"]
+            if rig.camera:
+                cam = rig.camera
                 
                 row = box.row()
                 row.prop(context.space_data, "lock_camera", text="Lock to View")
@@ -163,31 +895,34 @@ class QUICKSTUDIO_PT_panel(bpy.types.Panel):
                 col.prop(cam.data, "clip_end", text="Clip End")
                 
                 row = box.row()
-                row.prop(context.scene, "quickstudio_use_camera_track", text="Use Camera Track", 
+                row.prop(rig, "use_camera_track", text="Use Camera Track", 
                          icon='EMPTY_DATA', 
                          toggle=True)
                 
-                if context.scene.quickstudio_use_camera_track:
-                    if "CAM1 TRACK" in bpy.data.objects:
-                        cam_track = bpy.data.objects["CAM1 TRACK"]
+                if rig.use_camera_track:
+                    if rig.camera_track:
                         sub_box = box.box()
                         col = sub_box.column(align=True)
                         col.label(text="Camera Track Position:")
-                        col.prop(cam_track, "location", text="")
+                        col.prop(rig.camera_track, "location", text="")
                 else:
                     row = box.row()
                     row.label(text="Camera Target:")
-                    row.prop(context.scene, "quickstudio_camera_target", text="")
+                    row.prop(rig, "camera_target", text="")
+                
+                row = box.row(align=True)
+                row.prop(rig, "auto_frame", text="Auto Frame", icon='SHADING_BBOX', toggle=True)
+                row.operator("quickstudio.auto_frame", text="Frame Selected", icon='ZOOM_SELECTED')
                 
                 row = box.row()
                 row.prop(cam.data.dof, "use_dof", text="Depth of Field")
                 if cam.data.dof.use_dof:
                     col = box.column(align=True)
                     row = col.row(align=True)
-                    row.prop(context.scene, "quickstudio_dof_use_target", text="Use Target Object")
+                    row.prop(rig, "dof_use_target", text="Use Target Object")
                     
-                    if context.scene.quickstudio_dof_use_target:
-                        col.prop(context.scene, "quickstudio_dof_target", text="Focus Object")
+                    if rig.dof_use_target:
+                        col.prop(rig, "dof_target", text="Focus Object")
                     else:
                         col.prop(cam.data.dof, "focus_distance", text="Focus Distance")
                     
@@ -195,249 +930,2441 @@ class QUICKSTUDIO_PT_panel(bpy.types.Panel):
             
             box = layout.box()
             box.label(text="Lights Control", icon='LIGHT')
-            box.prop(context.scene, "quickstudio_light_target", text="Lights Target")
+            box.prop(rig, "light_target", text="Lights Target")
+            row = box.row(align=True)
+            row.prop(rig, "control_mode", expand=True)
+            row.operator("quickstudio.benchmark_control_modes", text="", icon='TIME')
+            box.operator("quickstudio.bulk_edit_lights", icon='LIGHT_SUN')
+            box.prop(context.scene, "quickstudio_fast_preview", icon='RENDER_RESULT')
+            box.prop(rig, "normalize_exposure")
+            row = box.row(align=True)
+            for preset, label, _description in LIGHT_COST_PRESET_ITEMS:
+                op = row.operator("quickstudio.apply_light_cost_preset", text=label)
+                op.preset = preset
+            if hasattr(bpy.types.Object, "light_linking"):
+                box.prop(rig, "link_collection")
             
-            if "LIGHTS CONTROL" in bpy.data.objects:
-                lights_control = bpy.data.objects["LIGHTS CONTROL"]
-                
-                for light_prefix in ["Key", "Fill", "Rim", "Back"]:
+            lights_control = rig.lights_control
+            if lights_control:
+                for group_index, label, energy_path, size_paths, light_indices in get_rig_state(context.scene, rig):
+                    group = rig.groups[group_index]
+                    show = group.show_expanded
+                    
                     box = layout.box()
-                    prop_name = f"quickstudio_show_{light_prefix.lower()}_light"
                     row = box.row()
-                    row.prop(context.scene, prop_name, icon='DOWNARROW_HLT' if getattr(context.scene, prop_name) else 'RIGHTARROW', icon_only=True, emboss=False)
-                    row.label(text=f"{light_prefix} Light", icon='LIGHT_AREA')
+                    row.prop(group, "show_expanded", icon='DOWNARROW_HLT' if show else 'RIGHTARROW', icon_only=True, emboss=False)
+                    row.label(text=label, icon='LIGHT_AREA')
                     
-                    if getattr(context.scene, prop_name):
-                        energy_prop = f"{light_prefix}_Energy"
-                        if energy_prop in lights_control:
+                    if show:
+                        if energy_path:
                             col = box.column(align=True)
-                            col.prop(lights_control, f'["{energy_prop}"]', text="Energy")
+                            col.prop(lights_control, energy_path, text="Energy")
                         
-                        size_prop = f"{light_prefix}_Size"
-                        size_y_prop = f"{light_prefix}_SizeY"
-                        if size_prop in lights_control and size_y_prop in lights_control:
+                        if size_paths:
                             col = box.column(align=True)
-                            col.prop(lights_control, f'["{size_prop}"]', text="Size X")
-                            col.prop(lights_control, f'["{size_y_prop}"]', text="Size Y")
+                            col.prop(lights_control, size_paths[0], text="Size X")
+                            col.prop(lights_control, size_paths[1], text="Size Y")
                         
                         col = box.column(align=True)
                         col.label(text="Color:")
                         
-                        light_obj = bpy.data.objects.get(f"{light_prefix} Light")
-                        if light_obj and light_obj.data:
-                            col.prop(light_obj.data, "color", text="")
+                        if len(light_indices) == 1:
+                            light_obj = rig.lights[light_indices[0]].object
+                            if light_obj and light_obj.data:
+                                col.prop(light_obj.data, "color", text="")
+                        else:
+                            # Only one page of lights is drawn, so big rings stay cheap.
+                            pages = (len(light_indices) + LIGHTS_PER_PAGE - 1) // LIGHTS_PER_PAGE
+                            start = (min(group.page, pages) - 1) * LIGHTS_PER_PAGE
+                            for index in light_indices[start:start + LIGHTS_PER_PAGE]:
+                                light_obj = rig.lights[index].object
+                                if light_obj and light_obj.data:
+                                    row = col.row(align=True)
+                                    row.label(text=light_obj.name)
+                                    row.prop(light_obj.data, "color", text="")
+                            if pages > 1:
+                                box.prop(group, "page", text=f"Page (of {pages})")
+                        
+                        col = box.column(align=True)
+                        row = col.row(align=True)
+                        row.prop(group, "cast_shadow", toggle=True)
+                        row.prop(group, "max_bounces")
+                        row = col.row(align=True)
+                        for attr, label in LIGHT_RAY_VISIBILITY:
+                            row.prop(group, attr, text=label, toggle=True)
+                        if hasattr(bpy.types.Object, "light_linking"):
+                            row = col.row(align=True)
+                            row.enabled = rig.link_collection is not None
+                            row.prop(group, "use_light_linking", toggle=True)
+                            row.prop(group, "use_shadow_linking", toggle=True)
             
             box = layout.box()
             box.label(text="Background", icon='WORLD')
             row = box.row()
             row.prop(context.scene, "quickstudio_bg_transparent", text="Transparent Background")
-            if not context.scene.quickstudio_bg_transparent:
+            box.row().prop(context.scene, "quickstudio_bg_mode", expand=True)
+            bg_mode = context.scene.quickstudio_bg_mode
+            if bg_mode == 'HDRI':
+                col = box.column(align=True)
+                col.prop(context.scene, "quickstudio_hdri_path", text="")
+                col.prop(context.scene, "quickstudio_hdri_strength", text="Strength")
+                col.prop(context.scene, "quickstudio_hdri_rotation", text="Rotation")
+            elif bg_mode == 'GRADIENT':
+                row = box.row(align=True)
+                row.prop(context.scene, "quickstudio_gradient_bottom", text="")
+                row.prop(context.scene, "quickstudio_gradient_top", text="")
+            elif not context.scene.quickstudio_bg_transparent:
                 box.prop(context.scene, "quickstudio_bg_color", text="")
             
+            box = layout.box()
+            box.label(text="Render", icon='RENDER_STILL')
+            current_profile = context.scene.quickstudio_render_profile
+            row = box.row(align=True)
+            for profile, label, _description in RENDER_PROFILE_ITEMS:
+                op = row.operator("quickstudio.apply_render_profile", text=label, depress=current_profile == profile)
+                op.profile = profile
+            row.operator("quickstudio.restore_render_settings", text="", icon='LOOP_BACK')
+            box.operator("quickstudio.render_queue", icon='RENDER_ANIMATION')
+            
             row = layout.row()
             row.scale_y = 1.5
             row.operator("quickstudio.reset_studio", text="Reset Studio", icon='TRASH')
-
-class QUICKSTUDIO_OT_create_studio(bpy.types.Operator):
-    bl_idname = "quickstudio.create_studio"
-    bl_label = "Create Studio"
-    bl_description = "Create a camera and lighting setup"
-    bl_options = {'REGISTER', 'UNDO'}
-    
-    def execute(self, context):
-        studio_collection = bpy.data.collections.new("STUDIO")
-        bpy.context.scene.collection.children.link(studio_collection)
-        
-        layer_collection = bpy.context.view_layer.layer_collection
-        for child in layer_collection.children:
-            if child.name == "STUDIO":
-                bpy.context.view_layer.active_layer_collection = child
-                break
-        
-        view = context.space_data.region_3d
-        view_matrix = view.view_matrix.copy()
-        
-        cam_data = bpy.data.cameras.new("CAM1")
-        cam = bpy.data.objects.new("CAM1", cam_data)
-        bpy.context.collection.objects.link(cam)
-        
-        cam.matrix_world = view_matrix.inverted()
-        bpy.context.scene.camera = cam
-        
-        if hasattr(context.scene, "quickstudio_use_camera_track"):
-            context.scene.quickstudio_use_camera_track = False
-        
-        lights_control = self.create_empty("LIGHTS CONTROL", location=(0, 0, 0), color=(1, 1, 0))
-        
-        target_point = Vector((0, 0, 0))
-        
-        key_pos = target_point + Vector((4, -4, 4))
-        key_light = self.create_light("Key Light", 'AREA', energy=250, location=key_pos, target=target_point)
-        self.add_light_constraint(key_light, lights_control)
-        
-        fill_pos = target_point + Vector((-4, -3, 2))
-        fill_light = self.create_light("Fill Light", 'AREA', energy=100, location=fill_pos, target=target_point)
-        self.add_light_constraint(fill_light, lights_control)
-        
-        rim_pos = target_point + Vector((2, 5, 3))
-        rim_light = self.create_light("Rim Light", 'AREA', energy=80, location=rim_pos, target=target_point)
-        self.add_light_constraint(rim_light, lights_control)
-        
-        back_pos = target_point + Vector((0, 1, 5))
-        back_light = self.create_light("Back Light", 'AREA', energy=100, location=back_pos, target=target_point)
-        self.add_light_constraint(back_light, lights_control)
-        
-        self.add_light_controls(lights_control, key_light, "Key")
-        self.add_light_controls(lights_control, fill_light, "Fill")
-        self.add_light_controls(lights_control, rim_light, "Rim")
-        self.add_light_controls(lights_control, back_light, "Back")
+            row.operator("quickstudio.benchmark_studio_cycle", text="", icon='TIME')
         
-        self.setup_light_drivers(key_light, lights_control, "Key")
-        self.setup_light_drivers(fill_light, lights_control, "Fill")
-        self.setup_light_drivers(rim_light, lights_control, "Rim")
-        self.setup_light_drivers(back_light, lights_control, "Back")
+        scene = context.scene
+        show = scene.quickstudio_show_profiler
+        box = layout.box()
+        row = box.row()
+        row.prop(scene, "quickstudio_show_profiler", icon='DOWNARROW_HLT' if show else 'RIGHTARROW', icon_only=True, emboss=False)
+        row.label(text="Profiling", icon='TIME')
         
-        if context.scene.world is None:
-            world = bpy.data.worlds.new("Studio World")
-            context.scene.world = world
-        
-        world = context.scene.world
-        world.use_nodes = True
-        
-        if "Background" in world.node_tree.nodes:
-            bg_node = world.node_tree.nodes["Background"]
-            bg_node.inputs[0].default_value = (
-                context.scene.quickstudio_bg_color[0],
-                context.scene.quickstudio_bg_color[1],
-                context.scene.quickstudio_bg_color[2],
-                1.0
-            )
-        
-        for obj in bpy.context.selected_objects:
-            obj.select_set(False)
-        lights_control.select_set(True)
-        bpy.context.view_layer.objects.active = lights_control
-        
-        self.report({'INFO'}, "Studio setup created successfully!")
-        return {'FINISHED'}
-    
-    def create_empty(self, name, location=(0, 0, 0), color=(1, 1, 1)):
-        empty = bpy.data.objects.new(name, None)
-        empty.empty_display_type = 'SPHERE'
-        empty.empty_display_size = 0.5
-        bpy.context.collection.objects.link(empty)
-        empty.location = location
-        empty.color = (color[0], color[1], color[2], 1.0)
-        empty.show_name = True
-        return empty
-    
-    def create_camera(self, name, location=(0, 0, 0), rotation=(0, 0, 0)):
-        cam_data = bpy.data.cameras.new(name)
-        cam = bpy.data.objects.new(name, cam_data)
-        bpy.context.collection.objects.link(cam)
-        cam.location = location
-        cam.rotation_euler = rotation
-        bpy.context.scene.camera = cam
-        return cam
-    
-    def create_light(self, name, light_type, energy=1000, location=(0, 0, 0), target=Vector((0, 0, 0))):
-        light_data = bpy.data.lights.new(name=name, type=light_type)
-        light_data.energy = energy
-        
-        if light_type == 'AREA':
-            light_data.shape = 'RECTANGLE'
-            light_data.size = 1
-            light_data.size_y = 0.5
-        
-        light_obj = bpy.data.objects.new(name=name, object_data=light_data)
-        bpy.context.collection.objects.link(light_obj)
-        light_obj.location = location
-        
-        direction = target - Vector(location)
-        rot_quat = direction.to_track_quat('-Z', 'Y')
-        light_obj.rotation_euler = rot_quat.to_euler()
-        
-        return light_obj
+        if show:
+            col = box.column(align=True)
+            col.prop(scene, "quickstudio_profile_redraw", text="Time Panel Redraws")
+            col.prop(scene, "quickstudio_profile_callbacks", text="Time Callbacks")
+            
+            if _profile_stats:
+                col = box.column(align=True)
+                ranked = sorted(_profile_stats.items(), key=lambda item: item[1]["total"], reverse=True)
+                for name, stats in ranked[:PROFILE_PANEL_ROWS]:
+                    col.label(text=f"{name.replace('QUICKSTUDIO_OT_', '')}: {stats['count']}x, "
+                                   f"{stats['total'] * 1000.0:.1f} ms, p95 {profile_p95(stats) * 1000.0:.2f} ms, "
+                                   f"{stats['depsgraph_updates']} updates")
+            
+            row = box.row(align=True)
+            row.operator("quickstudio.export_profile", icon='EXPORT')
+            row.operator("quickstudio.reset_profile", text="", icon='X')
+
+STUDIO_LIGHTS = (
+    ("Key", (4, -4, 4), 250),
+    ("Fill", (-4, -3, 2), 100),
+    ("Rim", (2, 5, 3), 80),
+    ("Back", (0, 1, 5), 100),
+)
+
+def studio_camera_matrix(target=(0, 0, 0), distance=12.0, elevation=20.0, azimuth=0.0):
+    target = Vector(target)
+    elevation = math.radians(elevation)
+    azimuth = math.radians(azimuth)
+    direction = Vector((
+        math.sin(azimuth) * math.cos(elevation),
+        -math.cos(azimuth) * math.cos(elevation),
+        math.sin(elevation),
+    ))
+    location = target + direction * distance
+    rot_quat = (target - location).to_track_quat('-Z', 'Y')
+    return Matrix.Translation(location) @ rot_quat.to_matrix().to_4x4()
+
+def create_empty(collection, name, location=(0, 0, 0), color=(1, 1, 1)):
+    empty = bpy.data.objects.new(name, None)
+    empty.empty_display_type = 'SPHERE'
+    empty.empty_display_size = 0.5
+    collection.objects.link(empty)
+    empty.location = location
+    empty.color = (color[0], color[1], color[2], 1.0)
+    empty.show_name = True
+    return empty
+
+def create_camera(collection, name, matrix):
+    cam_data = bpy.data.cameras.new(name)
+    cam = bpy.data.objects.new(name, cam_data)
+    collection.objects.link(cam)
+    cam.matrix_world = matrix
+    return cam
+
+def add_light_constraint(light, target):
+    constraint = light.constraints.new(type='CHILD_OF')
+    constraint.target = target
+    constraint.influence = 0.5
+
+def add_light_controls(control_empty, light, prefix):
+    light_data = light.data
+    control_empty[f"{prefix}_Energy"] = light_data.energy
     
-    def add_light_constraint(self, light, target):
-        constraint = light.constraints.new(type='CHILD_OF')
-        constraint.target = target
-        constraint.influence = 0.5
+    if light_data.type == 'AREA':
+        control_empty[f"{prefix}_Size"] = light_data.size
+        control_empty[f"{prefix}_SizeY"] = light_data.size_y
+
+def setup_light_drivers(light, control, prefix):
+    light_data = light.data
     
-    def add_light_controls(self, control_empty, light, prefix):
-        light_data = light.data
-        control_empty[f"{prefix}_Energy"] = light_data.energy
-        
-        if light_data.type == 'AREA':
-            control_empty[f"{prefix}_Size"] = light_data.size
-            control_empty[f"{prefix}_SizeY"] = light_data.size_y
+    energy_driver = light_data.driver_add("energy").driver
+    energy_driver.type = 'AVERAGE'
+    var = energy_driver.variables.new()
+    var.name = "energy"
+    var.type = 'SINGLE_PROP'
+    var.targets[0].id = control
+    var.targets[0].data_path = f'["{prefix}_Energy"]'
     
-    def setup_light_drivers(self, light, control, prefix):
-        light_data = light.data
-        
-        energy_driver = light_data.driver_add("energy").driver
-        energy_driver.type = 'AVERAGE'
-        var = energy_driver.variables.new()
-        var.name = "energy"
+    if light_data.type == 'AREA':
+        size_driver = light_data.driver_add("size").driver
+        size_driver.type = 'AVERAGE'
+        var = size_driver.variables.new()
+        var.name = "size"
         var.type = 'SINGLE_PROP'
         var.targets[0].id = control
-        var.targets[0].data_path = f'["{prefix}_Energy"]'
+        var.targets[0].data_path = f'["{prefix}_Size"]'
         
-        if light_data.type == 'AREA':
-            size_driver = light_data.driver_add("size").driver
-            size_driver.type = 'AVERAGE'
-            var = size_driver.variables.new()
-            var.name = "size"
-            var.type = 'SINGLE_PROP'
-            var.targets[0].id = control
-            var.targets[0].data_path = f'["{prefix}_Size"]'
-            
-            size_y_driver = light_data.driver_add("size_y").driver
-            size_y_driver.type = 'AVERAGE'
-            var = size_y_driver.variables.new()
-            var.name = "size_y"
-            var.type = 'SINGLE_PROP'
-            var.targets[0].id = control
-            var.targets[0].data_path = f'["{prefix}_SizeY"]'
+        size_y_driver = light_data.driver_add("size_y").driver
+        size_y_driver.type = 'AVERAGE'
+        var = size_y_driver.variables.new()
+        var.name = "size_y"
+        var.type = 'SINGLE_PROP'
+        var.targets[0].id = control
+        var.targets[0].data_path = f'["{prefix}_SizeY"]'
 
-class QUICKSTUDIO_OT_reset_studio(bpy.types.Operator):
-    bl_idname = "quickstudio.reset_studio"
-    bl_label = "Reset Studio"
-    bl_description = "Delete the studio setup"
-    bl_options = {'REGISTER', 'UNDO'}
+# Light datablock attribute -> suffix of the matching LIGHTS CONTROL property.
+LIGHT_CONTROLS = (
+    ("energy", "Energy"),
+    ("size", "Size"),
+    ("size_y", "SizeY"),
+)
+
+# Last values pushed to each light in baked mode, keyed by light datablock pointer.
+_baked_cache = {}
+
+def iter_rig_lights(rig):
+    for item in rig.lights:
+        light = item.object
+        if light and light.type == 'LIGHT':
+            yield item.group or item.name, light
+
+def remove_light_drivers(light):
+    for attr, _suffix in LIGHT_CONTROLS:
+        light.data.driver_remove(attr)
+
+def sync_baked_controls(rig, force=False):
+    lights_control = rig.lights_control
+    if not lights_control:
+        return 0
     
-    def execute(self, context):
-        context.scene.quickstudio_camera_target = None
-        context.scene.quickstudio_light_target = None
-        context.scene.quickstudio_dof_target = None
-        context.scene.quickstudio_dof_use_target = False
-        context.scene.quickstudio_use_camera_track = False
-        context.scene.quickstudio_bg_transparent = False
-        
-        context.scene.render.film_transparent = False
-        
-        if context.scene.world and "Background" in context.scene.world.node_tree.nodes:
-            bg_node = context.scene.world.node_tree.nodes["Background"]
-            bg_node.inputs[0].default_value = (0.05, 0.05, 0.05, 1.0)
-        
-        if "STUDIO" in bpy.data.collections:
-            studio_collection = bpy.data.collections["STUDIO"]
-            
-            for obj in list(studio_collection.objects):
-                bpy.data.objects.remove(obj, do_unlink=True)
+    changed = 0
+    for prefix, light in iter_rig_lights(rig):
+        light_data = light.data
+        cached = _baked_cache.setdefault(light_data.as_pointer(), {})
+        for attr, suffix in LIGHT_CONTROLS:
+            value = lights_control.get(f"{prefix}_{suffix}")
+            if value is None or (not force and cached.get(attr) == value):
+                continue
+            setattr(light_data, attr, value)
+            cached[attr] = value
+            changed += 1
+    return changed
+
+# Which studios an operator edits; see iter_rigs.
+RIG_SCOPE_ITEMS = [
+    ('ACTIVE', "Active Studio", "Only the active studio"),
+    ('SCENE', "Scene", "Every studio of the current scene"),
+    ('ALL', "All Scenes", "Every studio in the file"),
+]
+
+def iter_rigs(context, scope):
+    if scope == 'ACTIVE':
+        rig = get_active_rig(context.scene)
+        scenes = ()
+        if rig is not None:
+            yield rig
+    elif scope == 'SCENE':
+        scenes = (context.scene,)
+    else:
+        scenes = bpy.data.scenes
+    
+    # A rig shared between scenes is registered in each of them; edit it once.
+    seen = set()
+    for scene in scenes:
+        for rig in scene.quickstudio_rigs:
+            key = rig.collection.as_pointer() if rig.collection else rig.as_pointer()
+            if key not in seen:
+                seen.add(key)
+                yield rig
+
+def kelvin_to_rgb(kelvin):
+    # Tanner Helland's blackbody fit, evaluated for a whole array of temperatures
+    # and converted from sRGB to the scene-linear values Blender lights expect.
+    t = np.clip(np.asarray(kelvin, dtype=np.float64), 1000.0, 40000.0) / 100.0
+    warm = t <= 66.0
+    
+    r = np.where(warm, 255.0, 329.698727446 * np.power(np.maximum(t - 60.0, 1e-6), -0.1332047592))
+    g = np.where(warm,
+                 99.4708025861 * np.log(t) - 161.1195681661,
+                 288.1221695283 * np.power(np.maximum(t - 60.0, 1e-6), -0.0755148492))
+    b = np.where(t >= 66.0, 255.0,
+                 np.where(t <= 19.0, 0.0, 138.5177312231 * np.log(np.maximum(t - 10.0, 1e-6)) - 305.0447927307))
+    
+    srgb = np.clip(np.stack((r, g, b), axis=-1) / 255.0, 0.0, 1.0)
+    return np.where(srgb <= 0.04045, srgb / 12.92, np.power((srgb + 0.055) / 1.055, 2.4))
+
+def bulk_edit_lights(rigs, exposure=0.0, temperature=None, temperature_mix=1.0, preset_blend=0.0):
+    rows = []
+    for rig in rigs:
+        for prefix, light in iter_rig_lights(rig):
+            rows.append((rig.lights_control, prefix, light.data))
+    if not rows:
+        return 0
+    
+    # Indices of the rig lights inside bpy.data.lights, for foreach_get/foreach_set.
+    light_index = {light_data.as_pointer(): i for i, light_data in enumerate(bpy.data.lights)}
+    indices = np.fromiter((light_index[data.as_pointer()] for _control, _prefix, data in rows),
+                          dtype=np.int64, count=len(rows))
+    
+    default_energy = {prefix: energy for prefix, _offset, energy in STUDIO_LIGHTS}
+    energies = np.array([
+        control.get(f"{prefix}_Energy", data.energy) if control else data.energy
+        for control, prefix, data in rows
+    ], dtype=np.float64)
+    defaults = np.array([default_energy.get(prefix, energy) for (_c, prefix, _d), energy in zip(rows, energies)])
+    
+    energies = energies * (2.0 ** exposure)
+    energies += (defaults - energies) * preset_blend
+    
+    all_energies = np.empty(len(bpy.data.lights), dtype=np.float32)
+    bpy.data.lights.foreach_get("energy", all_energies)
+    all_energies[indices] = energies
+    bpy.data.lights.foreach_set("energy", all_energies)
+    
+    if temperature is not None:
+        colors = np.empty(len(bpy.data.lights) * 3, dtype=np.float32)
+        bpy.data.lights.foreach_get("color", colors)
+        colors = colors.reshape(-1, 3)
+        colors[indices] += (kelvin_to_rgb(temperature) - colors[indices]) * temperature_mix
+        bpy.data.lights.foreach_set("color", colors.ravel())
+    
+    # LIGHTS CONTROL stays the source of truth for drivers and baked mode.
+    for (control, prefix, _data), energy in zip(rows, energies.tolist()):
+        if control and f"{prefix}_Energy" in control:
+            control[f"{prefix}_Energy"] = energy
+    
+    return len(rows)
+
+LIGHT_COST_PRESET_ITEMS = [
+    ('FULL', "Full", "Every light casts shadows and reaches every ray type"),
+    ('LOOKDEV', "Look-Dev", "Only the key group casts shadows; few bounces, no transmission or volume rays"),
+    ('PREVIEW', "Fast", "No shadows and no indirect light from the rig"),
+]
+
+# Group settings per preset; 'key_shadow_only' keeps shadows on the first group.
+LIGHT_COST_PRESETS = {
+    'FULL': {
+        "cast_shadow": True, "max_bounces": 1024, "key_shadow_only": False,
+        "visible_diffuse": True, "visible_glossy": True,
+        "visible_transmission": True, "visible_volume_scatter": True,
+    },
+    'LOOKDEV': {
+        "cast_shadow": True, "max_bounces": 2, "key_shadow_only": True,
+        "visible_diffuse": True, "visible_glossy": True,
+        "visible_transmission": False, "visible_volume_scatter": False,
+    },
+    'PREVIEW': {
+        "cast_shadow": False, "max_bounces": 0, "key_shadow_only": False,
+        "visible_diffuse": True, "visible_glossy": False,
+        "visible_transmission": False, "visible_volume_scatter": False,
+    },
+}
+
+def apply_light_cost_preset(rigs, preset):
+    values = LIGHT_COST_PRESETS[preset]
+    count = 0
+    # Group updates are suspended while the values change, then every light of
+    # a rig is written in one pass with unchanged attributes skipped.
+    _light_settings_batch["active"] = True
+    try:
+        for rig in rigs:
+            for index, group in enumerate(rig.groups):
+                group.cast_shadow = values["cast_shadow"] and (index == 0 or not values["key_shadow_only"])
+                group.max_bounces = values["max_bounces"]
+                for attr in ("visible_diffuse", "visible_glossy", "visible_transmission", "visible_volume_scatter"):
+                    setattr(group, attr, values[attr])
+    finally:
+        _light_settings_batch["active"] = False
+    
+    for rig in rigs:
+        count += apply_light_settings(rig)
+    return count
+
+# Radius of the object the built-in layouts are designed around.
+FRAME_REFERENCE_RADIUS = 1.0
+
+# World-space (min, max) bounds per object pointer, dropped when the object changes.
+_bounds_cache = {}
+
+def object_world_bounds(obj, depsgraph):
+    key = obj.as_pointer()
+    bounds = _bounds_cache.get(key)
+    if bounds is not None:
+        return bounds
+    
+    eval_obj = obj.evaluated_get(depsgraph)
+    coords = None
+    if obj.type == 'MESH':
+        mesh = eval_obj.to_mesh()
+        try:
+            count = len(mesh.vertices)
+            if count:
+                coords = np.empty(count * 3, dtype=np.float32)
+                mesh.vertices.foreach_get("co", coords)
+                coords = coords.reshape(-1, 3)
+        finally:
+            eval_obj.to_mesh_clear()
+    if coords is None:
+        coords = np.array([tuple(corner) for corner in eval_obj.bound_box], dtype=np.float32)
+    
+    matrix = np.array(eval_obj.matrix_world, dtype=np.float64)
+    world = coords @ matrix[:3, :3].T + matrix[:3, 3]
+    bounds = (world.min(axis=0), world.max(axis=0))
+    _bounds_cache[key] = bounds
+    return bounds
+
+def combined_world_bounds(objects, depsgraph):
+    bounds = [object_world_bounds(obj, depsgraph) for obj in objects]
+    if not bounds:
+        return None
+    lows, highs = zip(*bounds)
+    return np.min(lows, axis=0), np.max(highs, axis=0)
+
+def light_parent_offset(light):
+    # Translation added by the rig's half-influence CHILD_OF constraint, so that
+    # lights can be placed where they should end up rather than where their basis is.
+    for constraint in light.constraints:
+        if constraint.type == 'CHILD_OF' and constraint.target and not constraint.mute:
+            return constraint.target.matrix_world.translation * constraint.influence
+    return Vector((0.0, 0.0, 0.0))
+
+def place_light(rig, light, offset):
+    center = Vector(rig.frame_center)
+    location = center + offset * rig.frame_scale
+    light.location = location - light_parent_offset(light)
+    light.rotation_euler = (center - location).to_track_quat('-Z', 'Y').to_euler()
+
+def light_layout_offset(rig, light):
+    location = light.location + light_parent_offset(light)
+    return (location - Vector(rig.frame_center)) / rig.frame_scale
+
+def frame_rig(rig, objects, depsgraph):
+    bounds = combined_world_bounds(objects, depsgraph)
+    if bounds is None:
+        return False
+    
+    low, high = bounds
+    center = Vector((low + high) / 2.0)
+    radius = max(float(np.linalg.norm(high - low)) / 2.0, 1e-3)
+    new_scale = radius / FRAME_REFERENCE_RADIUS
+    size_factor = new_scale / rig.frame_scale
+    
+    offsets = [(prefix, light, light_layout_offset(rig, light)) for prefix, light in iter_rig_lights(rig)]
+    rig.frame_center = center
+    rig.frame_scale = new_scale
+    
+    lights_control = rig.lights_control
+    for _prefix, light, offset in offsets:
+        place_light(rig, light, offset)
+    if lights_control:
+        for group in rig.groups:
+            for suffix in ("Size", "SizeY"):
+                key = f"{group.name}_{suffix}"
+                if key in lights_control:
+                    lights_control[key] = lights_control[key] * size_factor
+            group.size_ratio *= size_factor
+        lights_control.update_tag()
+        if rig.control_mode == 'BAKED':
+            sync_baked_controls(rig)
+        if rig.normalize_exposure:
+            normalize_rig_exposure(rig, depsgraph)
+    
+    cam = rig.camera
+    if cam:
+        # Keep the viewing direction, back off until the bounding sphere fits.
+        fov = min(cam.data.angle_x, cam.data.angle_y)
+        distance = radius * rig.frame_margin / math.sin(fov / 2.0)
+        forward = cam.matrix_world.to_quaternion() @ Vector((0.0, 0.0, -1.0))
+        cam.location = center - forward * distance
+        cam.data.clip_end = max(cam.data.clip_end, distance + radius * 2.0)
+        if rig.use_camera_track and rig.camera_track:
+            rig.camera_track.location = center
+    
+    return True
+
+def frame_rig_to_targets(context, rig):
+    targets = {obj for obj in (rig.camera_target, rig.light_target) if obj is not None}
+    return frame_rig(rig, targets, context.evaluated_depsgraph_get())
+
+def make_builtin_preset(energies, size=(1.0, 0.5), lens=50.0, background=(0.05, 0.05, 0.05)):
+    return {
+        "lights": {
+            prefix: {
+                "offset": list(offset),
+                "energy": energies.get(prefix, energy),
+                "size": size[0],
+                "size_y": size[1],
+                "color": [1.0, 1.0, 1.0],
+            }
+            for prefix, offset, energy in STUDIO_LIGHTS
+        },
+        "lens": lens,
+        "background": list(background),
+    }
+
+BUILTIN_PRESETS = {
+    "Default": make_builtin_preset({}),
+    "High Key": make_builtin_preset({"Key": 300, "Fill": 250, "Rim": 120, "Back": 200},
+                                    size=(2.0, 1.0), background=(0.8, 0.8, 0.8)),
+    "Low Key": make_builtin_preset({"Key": 300, "Fill": 20, "Rim": 150, "Back": 40},
+                                   lens=85.0, background=(0.005, 0.005, 0.005)),
+    "Rim Heavy": make_builtin_preset({"Key": 120, "Fill": 40, "Rim": 400, "Back": 300},
+                                     size=(0.5, 2.0), background=(0.01, 0.01, 0.01)),
+}
+
+PRESET_CACHE_SIZE = 16
+
+# User presets as read from disk; None until first needed.
+_user_presets = None
+# Built-in and user presets by name, in raw JSON form.
+_preset_library = {}
+# Parsed presets, least recently used first.
+_preset_cache = OrderedDict()
+# Enum items for Scene.quickstudio_preset, kept alive for Blender.
+_preset_items = []
+
+def get_preset_library_path():
+    return os.path.join(bpy.utils.user_resource('CONFIG', path="quickstudio", create=True), "presets.json")
+
+def rebuild_preset_library():
+    _preset_library.clear()
+    _preset_library.update(BUILTIN_PRESETS)
+    _preset_library.update(_user_presets)
+    _preset_cache.clear()
+    _preset_items[:] = [(name, name, "") for name in _preset_library]
+
+def load_preset_library(reload=False):
+    global _user_presets
+    if _user_presets is None or reload:
+        _user_presets = {}
+        path = get_preset_library_path()
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    _user_presets = json.load(f).get("presets", {})
+            except (OSError, ValueError) as e:
+                print(f"Quick Studio: could not read presets from {path}: {e}")
+        rebuild_preset_library()
+    return _preset_library
+
+def save_user_preset(name, raw):
+    load_preset_library()
+    _user_presets[name] = raw
+    with open(get_preset_library_path(), "w") as f:
+        json.dump({"version": 1, "presets": _user_presets}, f, separators=(",", ":"))
+    rebuild_preset_library()
+
+def parse_preset(raw):
+    lights = {}
+    for prefix, values in raw.get("lights", {}).items():
+        lights[prefix] = (
+            Vector(values.get("offset", (0.0, 0.0, 0.0))),
+            float(values.get("energy", 100.0)),
+            float(values.get("size", 1.0)),
+            float(values.get("size_y", 0.5)),
+            tuple(values.get("color", (1.0, 1.0, 1.0))),
+        )
+    lens = raw.get("lens")
+    background = raw.get("background")
+    return {
+        "lights": lights,
+        "lens": float(lens) if lens is not None else None,
+        "background": tuple(background) if background is not None else None,
+    }
+
+def get_preset(name):
+    preset = _preset_cache.get(name)
+    if preset is not None:
+        _preset_cache.move_to_end(name)
+        return preset
+    
+    raw = load_preset_library().get(name)
+    if raw is None:
+        return None
+    
+    preset = parse_preset(raw)
+    _preset_cache[name] = preset
+    if len(_preset_cache) > PRESET_CACHE_SIZE:
+        _preset_cache.popitem(last=False)
+    return preset
+
+def capture_preset(scene, rig):
+    lights_control = rig.lights_control
+    lights = {}
+    for item in rig.lights:
+        light = item.object
+        if not light or light.type != 'LIGHT':
+            continue
+        prefix = item.group or item.name
+        light_data = light.data
+        values = {
+            "offset": [round(v, 4) for v in light_layout_offset(rig, light)],
+            "energy": light_data.energy,
+            "color": [round(v, 4) for v in light_data.color],
+        }
+        if light_data.type == 'AREA':
+            values["size"] = light_data.size
+            values["size_y"] = light_data.size_y
+        if lights_control:
+            for attr, suffix in LIGHT_CONTROLS:
+                if attr in values and f"{prefix}_{suffix}" in lights_control:
+                    values[attr] = lights_control[f"{prefix}_{suffix}"]
+        if "size" in values:
+            values["size"] /= rig.frame_scale
+            values["size_y"] /= rig.frame_scale
+        lights[item.name] = values
+    
+    return {
+        "lights": lights,
+        "lens": rig.camera.data.lens if rig.camera else None,
+        "background": [round(v, 4) for v in scene.quickstudio_bg_color],
+    }
+
+def apply_preset(scene, rig, preset):
+    # Update the existing rig in place, the collection and its objects are kept.
+    lights_control = rig.lights_control
+    touched = set()
+    
+    for item in rig.lights:
+        light = item.object
+        values = preset["lights"].get(item.name)
+        if values is None or not light or light.type != 'LIGHT':
+            continue
+        
+        prefix = item.group or item.name
+        offset, energy, size, size_y, color = values
+        place_light(rig, light, offset)
+        light.data.color = color
+        touched.add(prefix)
+        
+        if lights_control:
+            lights_control[f"{prefix}_Energy"] = energy
+            if light.data.type == 'AREA':
+                lights_control[f"{prefix}_Size"] = size * rig.frame_scale
+                lights_control[f"{prefix}_SizeY"] = size_y * rig.frame_scale
+    
+    if lights_control:
+        # Preset energies are layout values again; sizes were scaled by frame_scale above.
+        for group in rig.groups:
+            if group.name in touched:
+                group.energy_ratio = 1.0
+                group.size_ratio = rig.frame_scale
+        lights_control.update_tag()
+        if rig.control_mode == 'BAKED':
+            sync_baked_controls(rig)
+        if rig.normalize_exposure:
+            normalize_rig_exposure(rig, bpy.context.evaluated_depsgraph_get(), evaluated=True)
+    
+    if preset["lens"] is not None and rig.camera:
+        rig.camera.data.lens = preset["lens"]
+    
+    if preset["background"] is not None:
+        scene.quickstudio_bg_color = preset["background"]
+
+def preset_items(self, context):
+    load_preset_library()
+    return _preset_items
+
+@profiled_update
+def update_preset(self, context):
+    rig = get_active_rig(self)
+    preset = get_preset(self.quickstudio_preset)
+    if rig is not None and preset is not None:
+        apply_preset(self, rig, preset)
+
+def setup_world_background(scene):
+    if scene.world is None:
+        world = bpy.data.worlds.new("Studio World")
+        # Only worlds we created are purged again on teardown.
+        world["quickstudio_created"] = True
+        scene.world = world
+    
+    apply_world_background(scene)
+
+def reset_world_background(scene):
+    scene.quickstudio_bg_transparent = False
+    scene.render.film_transparent = False
+    scene.quickstudio_bg_mode = 'COLOR'
+    
+    if scene.world and scene.world.use_nodes and "Background" in scene.world.node_tree.nodes:
+        bg_node = scene.world.node_tree.nodes["Background"]
+        bg_node.inputs[0].default_value = (0.05, 0.05, 0.05, 1.0)
+
+def collection_descendants(collection):
+    # Collection.children_recursive only exists from Blender 3.1.
+    found = set()
+    pending = list(collection.children)
+    while pending:
+        child = pending.pop()
+        if child not in found:
+            found.add(child)
+            pending.extend(child.children)
+    return found
+
+def teardown_studio(scene, index):
+    # Collect every datablock owned by the rig and free them in a single
+    # batch_remove call; light/camera data carry the drivers with them.
+    rig = scene.quickstudio_rigs[index]
+    studio_collection = rig.collection
+    freed = {"objects": 0, "lights": 0, "cameras": 0, "collections": 0, "worlds": 0}
+    ids = set()
+    
+    if studio_collection and is_shared_studio(studio_collection):
+        # Other scenes, collection instances or a library still use the rig:
+        # only detach it from this scene.
+        if scene.camera is not None and scene.camera == rig.camera:
+            scene.camera = None
+        if any(child == studio_collection for child in scene.collection.children):
+            scene.collection.children.unlink(studio_collection)
+    elif studio_collection:
+        objects = set(studio_collection.all_objects)
+        ids.update(objects)
+        freed["objects"] = len(objects)
+        
+        # Object data is only freed when every user is an object being removed.
+        data_users = Counter(obj.data for obj in objects if obj.data is not None)
+        for data, users in data_users.items():
+            if data.users - data.use_fake_user > users:
+                continue
+            if isinstance(data, bpy.types.Light):
+                freed["lights"] += 1
+            elif isinstance(data, bpy.types.Camera):
+                freed["cameras"] += 1
+            else:
+                continue
+            ids.add(data)
+        
+        ids.add(studio_collection)
+        children = collection_descendants(studio_collection)
+        ids.update(children)
+        freed["collections"] = 1 + len(children)
+        
+        for obj in objects:
+            _bounds_cache.pop(obj.as_pointer(), None)
+            if obj.data is not None:
+                _baked_cache.pop(obj.data.as_pointer(), None)
+    
+    scene.quickstudio_rigs.remove(index)
+    scene.quickstudio_active_rig = max(0, scene.quickstudio_active_rig - 1)
+    
+    if not scene.quickstudio_rigs:
+        world = scene.world
+        if world and world.get("quickstudio_created") and world.users - world.use_fake_user <= 1:
+            ids.add(world)
+            freed["worlds"] = 1
+            scene.quickstudio_bg_transparent = False
+            scene.render.film_transparent = False
+        else:
+            reset_world_background(scene)
+    
+    if ids:
+        bpy.data.batch_remove(ids)
+    
+    _rig_edits["objects_removed"] += freed["objects"]
+    invalidate_rig_state()
+    return freed
+
+# Shared rigs: one STUDIO collection used by several scenes, either linked
+# directly, instanced through a collection empty or linked from a library
+# .blend. The light data exists once however many scenes use it.
+def is_shared_studio(collection):
+    return (collection.library is not None or len(collection.users_scene) > 1
+            or len(collection.users_dupli_group) > 0)
+
+def override_studio_collection(collection, scene, view_layer):
+    # Without do_fully_editable (3.2+) Blender makes system overrides, whose
+    # properties stay locked like the linked data.
+    if bpy.app.version >= (3, 2, 0):
+        return collection.override_hierarchy_create(scene, view_layer, do_fully_editable=True)
+    return collection.override_hierarchy_create(scene, view_layer)
+
+SHARED_RIG_PROPS = ("control_mode", "frame_margin", "frame_center", "frame_scale", "normalize_exposure")
+
+def plain_props(owner, props):
+    return {prop: getattr(owner, prop) if prop != "frame_center" else tuple(getattr(owner, prop)) for prop in props}
+
+def shared_rig_settings(rig):
+    # Plain copy of the settings a shared rig entry inherits. Taken before any
+    # quickstudio_rigs.add(), which may reallocate the collection under rig.
+    return {
+        "rig": plain_props(rig, SHARED_RIG_PROPS),
+        "use_camera_track": rig.use_camera_track,
+        "groups": {group.name: plain_props(group, ("base_distance",) + SNAPSHOT_GROUP_PROPS) for group in rig.groups},
+    }
+
+def register_shared_rig(scene, collection, settings=None):
+    # Rebuild a rig entry from the objects of an existing studio collection.
+    # Group settings come from settings (see shared_rig_settings) when given,
+    # otherwise the base distances are measured from the light positions.
+    rig = scene.quickstudio_rigs.add()
+    rig.name = collection.name
+    rig.collection = collection
+    
+    lights = []
+    for obj in collection.all_objects:
+        if obj.type == 'LIGHT':
+            lights.append(obj)
+        elif obj.type == 'CAMERA' and rig.camera is None:
+            rig.camera = obj
+        elif obj.name.startswith("LIGHTS CONTROL"):
+            rig.lights_control = obj
+        elif obj.name.startswith("CAM1 TRACK"):
+            rig.camera_track = obj
+    
+    center = rig.lights_control.matrix_world.translation if rig.lights_control else Vector()
+    distances = {}
+    for light in lights:
+        group = light.get("quickstudio_group") or light.name.split()[0]
+        item = rig.lights.add()
+        item.name = light.get("quickstudio_id", group)
+        item.group = group
+        item.object = light
+        distances.setdefault(group, []).append((light.matrix_world.translation - center).length)
+    
+    for group, values in distances.items():
+        rig_group = rig.groups.add()
+        rig_group.name = group
+        group_settings = settings["groups"].get(group) if settings is not None else None
+        if group_settings is None:
+            rig_group.base_distance = sum(values) / len(values)
+            continue
+        for prop, value in group_settings.items():
+            setattr(rig_group, prop, value)
+    
+    if settings is not None:
+        for prop, value in settings["rig"].items():
+            setattr(rig, prop, value)
+        if settings["use_camera_track"] and rig.camera_track:
+            rig.use_camera_track = True
+    elif lights and lights[0].data.library is None:
+        anim = lights[0].data.animation_data
+        if anim is None or not anim.drivers:
+            rig.control_mode = 'BAKED'
+    
+    if scene.camera is None:
+        scene.camera = rig.camera
+    scene.quickstudio_active_rig = len(scene.quickstudio_rigs) - 1
+    invalidate_rig_state()
+    return rig
+
+# Scene-level rig settings of version 1.0 files, before rigs became a collection.
+LEGACY_RIG_PROPS = ("use_camera_track", "camera_target", "light_target", "dof_target", "dof_use_target")
+
+def migrate_legacy_studios(scene):
+    # Version 1.0 kept one STUDIO collection per scene and its settings on the
+    # scene; register such collections as rigs so they are not orphaned.
+    if scene.quickstudio_rigs:
+        return 0
+    
+    legacy = [child for child in scene.collection.children if child.name.startswith("STUDIO")
+              and any(obj.name.startswith("LIGHTS CONTROL") for obj in child.objects)]
+    for collection in legacy:
+        rig = register_shared_rig(scene, collection)
+        for prop in LEGACY_RIG_PROPS:
+            value = scene.pop(f"quickstudio_{prop}", None)
+            if value is not None:
+                # Stored bools come back as ints once their property is gone.
+                setattr(rig, prop, bool(value) if isinstance(getattr(rig, prop), bool) else value)
+    return len(legacy)
+
+def share_studio(rig, scene, mode='LINK'):
+    # LINK adds the collection itself to the scene and registers the rig there,
+    # so it stays editable; INSTANCE only adds a collection empty, which costs
+    # one object and can be moved per scene but not edited.
+    collection = rig.collection
+    if mode == 'INSTANCE':
+        empty = bpy.data.objects.new(f"{collection.name} Instance", None)
+        empty.instance_type = 'COLLECTION'
+        empty.instance_collection = collection
+        scene.collection.objects.link(empty)
+        _rig_edits["objects_added"] += 1
+        return empty
+    
+    if any(shared.collection == collection for shared in scene.quickstudio_rigs):
+        return None
+    if not any(child == collection for child in scene.collection.children):
+        scene.collection.children.link(collection)
+    return register_shared_rig(scene, collection, shared_rig_settings(rig))
+
+def link_library_studios(scene, filepath, override=False, view_layer=None):
+    # Every STUDIO collection of the library is linked, not appended: the
+    # file only stores a reference, and loading the same library again for
+    # another scene reuses the datablocks already in memory.
+    with bpy.data.libraries.load(filepath, link=True) as (data_from, data_to):
+        data_to.collections = [name for name in data_from.collections if name.startswith("STUDIO")]
+    
+    rigs = []
+    for collection in data_to.collections:
+        if collection is None:
+            continue
+        if override and view_layer is not None and hasattr(collection, "override_hierarchy_create"):
+            collection = override_studio_collection(collection, scene, view_layer)
+        if not any(child == collection for child in scene.collection.children):
+            scene.collection.children.link(collection)
+        rigs.append(register_shared_rig(scene, collection))
+    return rigs
+
+def copy_studio_collection(collection):
+    # Local copy of a shared rig: objects and their data are duplicated and
+    # constraints and drivers pointing inside the rig follow the copies.
+    copy = bpy.data.collections.new(collection.name)
+    copies = {}
+    for obj in collection.all_objects:
+        obj_copy = obj.copy()
+        if obj.data is not None:
+            obj_copy.data = obj.data.copy()
+            copies[obj.data] = obj_copy.data
+        copy.objects.link(obj_copy)
+        copies[obj] = obj_copy
+    
+    for obj_copy in (copied for copied in copies.values() if isinstance(copied, bpy.types.Object)):
+        for constraint in obj_copy.constraints:
+            target = getattr(constraint, "target", None)
+            if target in copies:
+                constraint.target = copies[target]
+        for id_block in (obj_copy, obj_copy.data):
+            anim = getattr(id_block, "animation_data", None)
+            if anim is None:
+                continue
+            for fcurve in anim.drivers:
+                for variable in fcurve.driver.variables:
+                    for driver_target in variable.targets:
+                        if driver_target.id in copies:
+                            driver_target.id = copies[driver_target.id]
+    
+    _rig_edits["objects_added"] += len(collection.all_objects)
+    return copy
+
+def localize_studio(scene, index, view_layer=None):
+    # Give this scene its own rig in place of the shared one. Library rigs get
+    # a library override, so unchanged properties keep following the library.
+    rig = scene.quickstudio_rigs[index]
+    shared = rig.collection
+    camera = rig.camera
+    settings = shared_rig_settings(rig)
+    if shared.library is not None and view_layer is not None and hasattr(shared, "override_hierarchy_create"):
+        local = override_studio_collection(shared, scene, view_layer)
+    else:
+        local = copy_studio_collection(shared)
+    
+    if scene.camera is not None and scene.camera == camera:
+        scene.camera = None
+    if any(child == shared for child in scene.collection.children):
+        scene.collection.children.unlink(shared)
+    if not any(child == local for child in scene.collection.children):
+        scene.collection.children.link(local)
+    
+    register_shared_rig(scene, local, settings)
+    scene.quickstudio_rigs.remove(index)
+    scene.quickstudio_active_rig = len(scene.quickstudio_rigs) - 1
+    invalidate_rig_state()
+    return scene.quickstudio_rigs[-1]
+
+LIGHTS_PER_PAGE = 8
+
+def four_point_layout():
+    return {
+        "ids": [prefix for prefix, _offset, _energy in STUDIO_LIGHTS],
+        "names": [f"{prefix} Light" for prefix, _offset, _energy in STUDIO_LIGHTS],
+        "groups": [prefix for prefix, _offset, _energy in STUDIO_LIGHTS],
+        "offsets": np.array([offset for _prefix, offset, _energy in STUDIO_LIGHTS], dtype=np.float64),
+        "energies": np.array([energy for _prefix, _offset, energy in STUDIO_LIGHTS], dtype=np.float64),
+        "sizes": np.tile((1.0, 0.5), (len(STUDIO_LIGHTS), 1)),
+    }
+
+def ring_layout(rings=1, lights_per_ring=16, radius=5.0, ring_energy=800.0, size=(0.5, 0.5),
+                min_elevation=15.0, max_elevation=60.0):
+    # One group per ring; every ring shares ring_energy between its lights.
+    if rings > 1:
+        elevations = np.radians(np.linspace(min_elevation, max_elevation, rings))
+    else:
+        elevations = np.radians([(min_elevation + max_elevation) / 2.0])
+    
+    steps = np.arange(lights_per_ring) / lights_per_ring * 2.0 * np.pi
+    # Stagger alternate rings by half a step so lights do not line up vertically.
+    azimuths = steps[None, :] + (np.arange(rings)[:, None] % 2) * (np.pi / lights_per_ring)
+    elevations = np.repeat(elevations[:, None], lights_per_ring, axis=1)
+    
+    offsets = radius * np.stack((
+        np.cos(elevations) * np.cos(azimuths),
+        np.cos(elevations) * np.sin(azimuths),
+        np.sin(elevations),
+    ), axis=-1).reshape(-1, 3)
+    
+    ring_names = [f"Ring{ring + 1}" for ring in range(rings)]
+    count = rings * lights_per_ring
+    return {
+        "ids": [f"{name}_{index + 1:02d}" for name in ring_names for index in range(lights_per_ring)],
+        "names": [f"{name} Light {index + 1:02d}" for name in ring_names for index in range(lights_per_ring)],
+        "groups": [name for name in ring_names for _index in range(lights_per_ring)],
+        "offsets": offsets,
+        "energies": np.full(count, ring_energy / lights_per_ring),
+        "sizes": np.tile(size, (count, 1)),
+    }
+
+def track_eulers(directions):
+    # Vectorized equivalent of Vector.to_track_quat('-Z', 'Y').to_euler() for many
+    # direction vectors: -Z points along the direction, Y stays as close to world up as possible.
+    z_axis = -directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    up = np.where(np.abs(z_axis[:, 2:3]) > 0.9999, (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+    y_axis = up - np.sum(up * z_axis, axis=1, keepdims=True) * z_axis
+    y_axis /= np.linalg.norm(y_axis, axis=1, keepdims=True)
+    x_axis = np.cross(y_axis, z_axis)
+    
+    return np.stack((
+        np.arctan2(y_axis[:, 2], z_axis[:, 2]),
+        -np.arcsin(np.clip(x_axis[:, 2], -1.0, 1.0)),
+        np.arctan2(x_axis[:, 1], x_axis[:, 0]),
+    ), axis=-1)
+
+def new_lights(layout, start=0, stop=None):
+    # Light objects are created unlinked; nothing here touches the depsgraph.
+    lights = []
+    rows = zip(layout["names"][start:stop], layout["energies"][start:stop].tolist(), layout["sizes"][start:stop].tolist())
+    for name, energy, (size, size_y) in rows:
+        light_data = bpy.data.lights.new(name=name, type='AREA')
+        light_data.energy = energy
+        light_data.shape = 'RECTANGLE'
+        light_data.size = size
+        light_data.size_y = size_y
+        lights.append(bpy.data.objects.new(name=name, object_data=light_data))
+    return lights
+
+def place_lights(collection, lights, layout, target=(0.0, 0.0, 0.0)):
+    # Lights must be linked before anything else so that collection.objects holds
+    # exactly them and their transforms can be written with one foreach_set each.
+    for light_obj in lights:
+        collection.objects.link(light_obj)
+    
+    locations = np.asarray(target, dtype=np.float64) + layout["offsets"]
+    collection.objects.foreach_set("location", locations.astype(np.float32).ravel())
+    eulers = track_eulers(np.asarray(target, dtype=np.float64) - locations)
+    collection.objects.foreach_set("rotation_euler", eulers.astype(np.float32).ravel())
+
+# Lights created per step of an incremental build.
+BUILD_STEP_LIGHTS = 16
+# Scenes with more objects than this build incrementally unless told otherwise.
+INCREMENTAL_BUILD_OBJECTS = 20000
+
+def build_studio_steps(scene, view_layer=None, camera_matrix=None, framing=None, control_mode=None, preset=None,
+                       layout=None, step_lights=None):
+    # Generator behind build_studio: yields the progress (0..1) after each step
+    # and returns the rig. Datablocks are created in steps of step_lights lights;
+    # everything that changes depsgraph relations (linking, constraints, drivers)
+    # happens in the final step so the relations are rebuilt once.
+    if camera_matrix is None:
+        camera_matrix = studio_camera_matrix(**(framing or {}))
+    if layout is None:
+        layout = four_point_layout()
+    
+    count = len(layout["names"])
+    step_lights = step_lights or count or 1
+    lights = []
+    try:
+        for start in range(0, count, step_lights):
+            lights.extend(new_lights(layout, start, start + step_lights))
+            yield len(lights) / (count + 1)
+    except GeneratorExit:
+        # Cancelled: nothing was linked yet, so the new datablocks can just go.
+        bpy.data.batch_remove(lights + [light.data for light in lights])
+        raise
+    
+    studio_collection = bpy.data.collections.new("STUDIO")
+    place_lights(studio_collection, lights, layout)
+    
+    cam = create_camera(studio_collection, "CAM1", camera_matrix)
+    scene.camera = cam
+    
+    lights_control = create_empty(studio_collection, "LIGHTS CONTROL", location=(0, 0, 0), color=(1, 1, 0))
+    
+    rig = scene.quickstudio_rigs.add()
+    rig.name = studio_collection.name
+    rig.collection = studio_collection
+    rig.camera = cam
+    rig.lights_control = lights_control
+    if control_mode is not None:
+        rig.control_mode = control_mode
+    baked = rig.control_mode == 'BAKED'
+    
+    # Layout energies are meant for the layout distances, the base of exposure normalization.
+    distances = np.linalg.norm(layout["offsets"], axis=1)
+    groups = np.array(layout["groups"])
+    
+    for light_id, group, light in zip(layout["ids"], layout["groups"], lights):
+        if group not in rig.groups:
+            rig_group = rig.groups.add()
+            rig_group.name = group
+            rig_group.base_distance = float(distances[groups == group].mean())
+            add_light_controls(lights_control, light, group)
+        
+        add_light_constraint(light, lights_control)
+        if not baked:
+            setup_light_drivers(light, lights_control, group)
+        
+        item = rig.lights.add()
+        item.name = light_id
+        item.group = group
+        item.object = light
+        # Kept on the object so other scenes and files can rebuild the rig entry.
+        light["quickstudio_id"] = light_id
+        light["quickstudio_group"] = group
+    
+    if baked:
+        sync_baked_controls(rig, force=True)
+    
+    # Linked last, once the whole rig is wired up.
+    scene.collection.children.link(studio_collection)
+    
+    if view_layer is not None:
+        for child in view_layer.layer_collection.children:
+            if child.collection == studio_collection:
+                view_layer.active_layer_collection = child
+                break
+    
+    scene.quickstudio_active_rig = len(scene.quickstudio_rigs) - 1
+    invalidate_rig_state()
+    
+    setup_world_background(scene)
+    
+    if preset is not None:
+        apply_preset(scene, rig, preset)
+    
+    if view_layer is not None:
+        for obj in view_layer.objects.selected:
+            obj.select_set(False, view_layer=view_layer)
+        lights_control.select_set(True, view_layer=view_layer)
+        view_layer.objects.active = lights_control
+    
+    return rig
+
+def build_studio(scene, view_layer=None, camera_matrix=None, framing=None, control_mode=None, preset=None,
+                 layout=None):
+    # Pure-data entry point: everything is created from explicit arguments so
+    # it also runs under `blender --background`, where there is no 3D view.
+    steps = build_studio_steps(scene, view_layer, camera_matrix, framing, control_mode, preset, layout)
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+def time_relations_update(view_layer):
+    # Evaluate now, so the one relations rebuild of a new rig can be measured.
+    start = time.perf_counter()
+    view_layer.update()
+    return time.perf_counter() - start
+
+# Incremental build driven by bpy.app.timers; only one runs at a time.
+_async_build = {"steps": None, "progress": 0.0, "message": ""}
+
+def tag_panel_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def push_undo_step(message):
+    # Timer callbacks run without a window, where ed.undo_push fails its poll.
+    windows = bpy.context.window_manager.windows
+    if not windows:
+        return
+    window = windows[0]
+    if hasattr(bpy.context, "temp_override"):
+        with bpy.context.temp_override(window=window, screen=window.screen):
+            bpy.ops.ed.undo_push(message=message)
+    else:
+        bpy.ops.ed.undo_push({"window": window, "screen": window.screen}, message=message)
+
+def start_async_build(scene, view_layer, **options):
+    _async_build["steps"] = build_studio_steps(scene, view_layer, step_lights=BUILD_STEP_LIGHTS, **options)
+    _async_build["view_layer"] = view_layer
+    _async_build["progress"] = 0.0
+    _async_build["message"] = ""
+    _async_build["started"] = time.perf_counter()
+    bpy.app.timers.register(run_async_build_step, first_interval=0.0)
+
+def run_async_build_step():
+    steps = _async_build["steps"]
+    if steps is None:
+        return None
+    
+    try:
+        _async_build["progress"] = next(steps)
+    except StopIteration as done:
+        relations = time_relations_update(_async_build["view_layer"])
+        _async_build["message"] = (f"Built '{done.value.name}' in {time.perf_counter() - _async_build['started']:.2f} s, "
+                                   f"relations update {relations * 1000.0:.1f} ms")
+        print(_async_build["message"])
+        finish_async_build()
+        if not bpy.app.background:
+            push_undo_step("Create Studio")
+        return None
+    
+    tag_panel_redraw()
+    # A short pause lets Blender handle events and redraw between steps.
+    return 0.01
+
+def finish_async_build():
+    _async_build["steps"] = None
+    _async_build["view_layer"] = None
+    _async_build["progress"] = 0.0
+    tag_panel_redraw()
+
+def cancel_async_build():
+    steps = _async_build["steps"]
+    if steps is not None:
+        steps.close()
+        _async_build["message"] = "Studio build cancelled"
+        finish_async_build()
+    if bpy.app.timers.is_registered(run_async_build_step):
+        bpy.app.timers.unregister(run_async_build_step)
+
+SNAPSHOT_FORMAT = "quickstudio-snapshot"
+SNAPSHOT_VERSION = 1
+
+SNAPSHOT_SCENE_PROPS = (
+    "quickstudio_bg_color",
+    "quickstudio_bg_transparent",
+    "quickstudio_bg_mode",
+    "quickstudio_hdri_path",
+    "quickstudio_hdri_strength",
+    "quickstudio_hdri_rotation",
+    "quickstudio_gradient_top",
+    "quickstudio_gradient_bottom",
+)
+SNAPSHOT_RIG_PROPS = ("control_mode", "frame_margin", "frame_center", "frame_scale",
+                      "use_camera_track", "dof_use_target", "auto_frame", "normalize_exposure")
+SNAPSHOT_TARGETS = ("camera_target", "light_target", "dof_target", "link_collection")
+SNAPSHOT_GROUP_PROPS = ("cast_shadow", "max_bounces", "use_light_linking", "use_shadow_linking",
+                        "base_distance", "energy_ratio", "size_ratio",
+                        *(attr for attr, _label in LIGHT_RAY_VISIBILITY))
+
+def snapshot_value(value):
+    # Rounded plain values keep snapshots small and stable between saves.
+    if isinstance(value, float):
+        return round(value, 5)
+    if isinstance(value, (bool, int, str)) or value is None:
+        return value
+    return [snapshot_value(v) for v in value]
+
+def capture_snapshot(scene, rig):
+    items = [item for item in rig.lights if item.object and item.object.type == 'LIGHT']
+    lights_control = rig.lights_control
+    camera = rig.camera
+    
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "lights": {
+            "ids": [item.name for item in items],
+            "names": [item.object.name for item in items],
+            "groups": [item.group or item.name for item in items],
+            "location": [snapshot_value(item.object.location) for item in items],
+            "rotation": [snapshot_value(item.object.rotation_euler) for item in items],
+            "energy": [snapshot_value(item.object.data.energy) for item in items],
+            "size": [snapshot_value((item.object.data.size, item.object.data.size_y)) for item in items],
+            "color": [snapshot_value(item.object.data.color) for item in items],
+        },
+        "controls": {},
+        "control_location": [0.0, 0.0, 0.0],
+        "camera": None,
+        "camera_track_location": None,
+        "rig": {prop: snapshot_value(getattr(rig, prop)) for prop in SNAPSHOT_RIG_PROPS},
+        "targets": {prop: getattr(rig, prop).name if getattr(rig, prop) else None for prop in SNAPSHOT_TARGETS},
+        "groups": {group.name: {prop: snapshot_value(getattr(group, prop)) for prop in SNAPSHOT_GROUP_PROPS}
+                   for group in rig.groups},
+        "scene": {prop: snapshot_value(getattr(scene, prop)) for prop in SNAPSHOT_SCENE_PROPS},
+    }
+    
+    if lights_control:
+        snapshot["controls"] = {key: snapshot_value(lights_control[key]) for key in lights_control.keys()
+                                if isinstance(lights_control[key], (int, float))}
+        snapshot["control_location"] = snapshot_value(lights_control.location)
+    if rig.camera_track:
+        snapshot["camera_track_location"] = snapshot_value(rig.camera_track.location)
+    if camera:
+        camera_data = camera.data
+        snapshot["camera"] = {
+            "matrix": snapshot_value(value for row in camera.matrix_world for value in row),
+            "lens": snapshot_value(camera_data.lens),
+            "sensor_width": snapshot_value(camera_data.sensor_width),
+            "clip_start": snapshot_value(camera_data.clip_start),
+            "clip_end": snapshot_value(camera_data.clip_end),
+            "use_dof": camera_data.dof.use_dof,
+            "focus_distance": snapshot_value(camera_data.dof.focus_distance),
+            "aperture_fstop": snapshot_value(camera_data.dof.aperture_fstop),
+        }
+    return snapshot
+
+def write_snapshot(path, snapshot):
+    data = json.dumps(snapshot, separators=(",", ":")).encode()
+    tmp_path = path + ".tmp"
+    with (gzip.open if path.endswith(".gz") else open)(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    
+    snapshot = json.loads(data)
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a Quick Studio snapshot")
+    if snapshot.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot version {snapshot['version']} is newer than this add-on "
+                         f"supports ({SNAPSHOT_VERSION})")
+    return snapshot
+
+def apply_snapshot(scene, snapshot, view_layer=None):
+    # Builds a new rig straight from the snapshot's arrays, then writes the
+    # remaining state with bulk foreach_set calls where Blender offers them.
+    # Returns the rig and the names of targets missing from this file.
+    lights = snapshot["lights"]
+    count = len(lights["ids"])
+    layout = {
+        "ids": lights["ids"],
+        "names": lights["names"],
+        "groups": lights["groups"],
+        "offsets": np.array(lights["location"], dtype=np.float64).reshape(-1, 3),
+        "energies": np.array(lights["energy"], dtype=np.float64),
+        "sizes": np.array(lights["size"], dtype=np.float64).reshape(-1, 2),
+    }
+    
+    camera = snapshot.get("camera")
+    camera_matrix = None
+    if camera:
+        values = camera["matrix"]
+        camera_matrix = Matrix([values[0:4], values[4:8], values[8:12], values[12:16]])
+    
+    rig_values = snapshot.get("rig", {})
+    rig = build_studio(scene, view_layer, camera_matrix=camera_matrix,
+                       control_mode=rig_values.get("control_mode"), layout=layout)
+    rig.frame_margin = rig_values.get("frame_margin", rig.frame_margin)
+    rig.frame_center = rig_values.get("frame_center", rig.frame_center)
+    rig.frame_scale = rig_values.get("frame_scale", rig.frame_scale)
+    
+    # The lights were linked first, so they are the first rows of the collection.
+    objects = rig.collection.objects
+    rotations = np.empty(len(objects) * 3, dtype=np.float32)
+    objects.foreach_get("rotation_euler", rotations)
+    rotations[:count * 3] = np.asarray(lights["rotation"], dtype=np.float32).ravel()
+    objects.foreach_set("rotation_euler", rotations)
+    
+    light_index = {light_data.as_pointer(): i for i, light_data in enumerate(bpy.data.lights)}
+    indices = np.fromiter((light_index[item.object.data.as_pointer()] for item in rig.lights),
+                          dtype=np.int64, count=len(rig.lights))
+    colors = np.empty(len(bpy.data.lights) * 3, dtype=np.float32)
+    bpy.data.lights.foreach_get("color", colors)
+    colors = colors.reshape(-1, 3)
+    colors[indices] = np.asarray(lights["color"], dtype=np.float32).reshape(-1, 3)
+    bpy.data.lights.foreach_set("color", colors.ravel())
+    
+    lights_control = rig.lights_control
+    lights_control.location = snapshot.get("control_location", (0.0, 0.0, 0.0))
+    for key, value in snapshot.get("controls", {}).items():
+        lights_control[key] = value
+    lights_control.update_tag()
+    if rig.control_mode == 'BAKED':
+        sync_baked_controls(rig, force=True)
+    
+    if camera:
+        camera_data = rig.camera.data
+        camera_data.lens = camera["lens"]
+        camera_data.sensor_width = camera["sensor_width"]
+        camera_data.clip_start = camera["clip_start"]
+        camera_data.clip_end = camera["clip_end"]
+        camera_data.dof.use_dof = camera["use_dof"]
+        camera_data.dof.focus_distance = camera["focus_distance"]
+        camera_data.dof.aperture_fstop = camera["aperture_fstop"]
+    
+    _light_settings_batch["active"] = True
+    try:
+        for group in rig.groups:
+            for prop, value in snapshot.get("groups", {}).get(group.name, {}).items():
+                setattr(group, prop, value)
+    finally:
+        _light_settings_batch["active"] = False
+    
+    for prop, value in snapshot.get("scene", {}).items():
+        if hasattr(scene, prop):
+            setattr(scene, prop, value)
+    
+    # Targets are matched by name; the update callbacks re-wire the constraints.
+    missing = []
+    for prop, name in snapshot.get("targets", {}).items():
+        if name is None:
+            continue
+        target = (bpy.data.collections if prop == "link_collection" else bpy.data.objects).get(name)
+        if target is None:
+            missing.append(name)
+        else:
+            setattr(rig, prop, target)
+    apply_light_settings(rig)
+    
+    if rig_values.get("use_camera_track"):
+        rig.use_camera_track = True
+        if snapshot.get("camera_track_location") is not None:
+            rig.camera_track.location = snapshot["camera_track_location"]
+    rig.dof_use_target = rig_values.get("dof_use_target", False)
+    rig.normalize_exposure = rig_values.get("normalize_exposure", False)
+    # Last, so a rig with auto frame fits the targets of this file once.
+    rig.auto_frame = rig_values.get("auto_frame", False)
+    
+    invalidate_rig_state()
+    return rig, missing
+
+RENDER_PROFILE_ITEMS = [
+    ('DRAFT', "Draft", "Low samples and bounces at half resolution for look-dev"),
+    ('PREVIEW', "Preview", "Denoised mid-quality renders for client previews"),
+    ('FINAL', "Final", "Full resolution, high sample final renders"),
+]
+
+# Settings per profile as "<scene attribute>.<property>" paths. Paths whose
+# owner is missing (e.g. Cycles disabled) are skipped.
+RENDER_PROFILES = {
+    'DRAFT': {
+        "render.resolution_percentage": 50,
+        "cycles.samples": 32,
+        "cycles.use_adaptive_sampling": True,
+        "cycles.adaptive_threshold": 0.1,
+        "cycles.use_denoising": True,
+        "cycles.max_bounces": 4,
+        "cycles.diffuse_bounces": 1,
+        "cycles.glossy_bounces": 1,
+        "cycles.transmission_bounces": 2,
+        "cycles.transparent_max_bounces": 4,
+        "eevee.taa_render_samples": 16,
+    },
+    'PREVIEW': {
+        "render.resolution_percentage": 75,
+        "cycles.samples": 128,
+        "cycles.use_adaptive_sampling": True,
+        "cycles.adaptive_threshold": 0.05,
+        "cycles.use_denoising": True,
+        "cycles.max_bounces": 8,
+        "cycles.diffuse_bounces": 2,
+        "cycles.glossy_bounces": 2,
+        "cycles.transmission_bounces": 6,
+        "cycles.transparent_max_bounces": 8,
+        "eevee.taa_render_samples": 32,
+    },
+    'FINAL': {
+        "render.resolution_percentage": 100,
+        "cycles.samples": 1024,
+        "cycles.use_adaptive_sampling": True,
+        "cycles.adaptive_threshold": 0.01,
+        "cycles.use_denoising": True,
+        "cycles.max_bounces": 12,
+        "cycles.diffuse_bounces": 4,
+        "cycles.glossy_bounces": 4,
+        "cycles.transmission_bounces": 12,
+        "cycles.transparent_max_bounces": 8,
+        "eevee.taa_render_samples": 128,
+    },
+}
+
+RENDER_SNAPSHOT_KEY = "quickstudio_render_snapshot"
+
+def resolve_render_setting(scene, path):
+    owner_name, attr = path.split(".")
+    owner = getattr(scene, owner_name, None)
+    if owner is None or not hasattr(owner, attr):
+        return None, attr
+    return owner, attr
+
+def apply_render_profile(scene, profile):
+    # Snapshot every setting any profile touches, once, so restoring is exact
+    # no matter how many profiles were applied in between.
+    if RENDER_SNAPSHOT_KEY not in scene:
+        paths = {path for settings in RENDER_PROFILES.values() for path in settings}
+        snapshot = {}
+        for path in sorted(paths):
+            owner, attr = resolve_render_setting(scene, path)
+            if owner is not None:
+                snapshot[path] = getattr(owner, attr)
+        scene[RENDER_SNAPSHOT_KEY] = snapshot
+    
+    for path, value in RENDER_PROFILES[profile].items():
+        owner, attr = resolve_render_setting(scene, path)
+        if owner is not None:
+            setattr(owner, attr, value)
+    
+    scene.quickstudio_render_profile = profile
+
+def restore_render_settings(scene):
+    snapshot = scene.get(RENDER_SNAPSHOT_KEY)
+    if snapshot is None:
+        return False
+    
+    for path, value in snapshot.items():
+        owner, attr = resolve_render_setting(scene, path)
+        if owner is not None:
+            setattr(owner, attr, value)
+    
+    del scene[RENDER_SNAPSHOT_KEY]
+    scene.quickstudio_render_profile = 'NONE'
+    return True
+
+# Viewport settings lowered while LIGHTS CONTROL values are being dragged.
+# Same "<scene attribute>.<property>" paths as the render profiles.
+FAST_PREVIEW_SETTINGS = {
+    "eevee.taa_samples": 1,
+    "eevee.use_soft_shadows": False,
+    "eevee.shadow_ray_count": 1,
+    "eevee.shadow_step_count": 1,
+    "cycles.preview_samples": 4,
+    "cycles.use_preview_adaptive_sampling": True,
+    "render.preview_pixel_size": '4',
+}
+FAST_PREVIEW_SNAPSHOT_KEY = "quickstudio_fast_preview_snapshot"
+# Seconds without control changes before full quality comes back.
+FAST_PREVIEW_DELAY = 0.4
+
+def enter_fast_preview(scene):
+    if FAST_PREVIEW_SNAPSHOT_KEY in scene:
+        return
+    
+    settings = {}
+    for path, value in FAST_PREVIEW_SETTINGS.items():
+        owner, attr = resolve_render_setting(scene, path)
+        if owner is not None:
+            settings[path] = getattr(owner, attr)
+            if settings[path] != value:
+                setattr(owner, attr, value)
+    
+    # Lights outside the studios are hidden per view layer, which avoids a relations rebuild.
+    rig_lights = {item.object.as_pointer() for rig in scene.quickstudio_rigs for item in rig.lights if item.object}
+    hidden = []
+    view_layer = bpy.context.view_layer
+    for obj in scene.objects:
+        if obj.type == 'LIGHT' and obj.as_pointer() not in rig_lights and not obj.hide_get(view_layer=view_layer):
+            obj.hide_set(True, view_layer=view_layer)
+            hidden.append(obj.name)
+    
+    scene[FAST_PREVIEW_SNAPSHOT_KEY] = {"settings": settings, "hidden": hidden, "view_layer": view_layer.name}
+
+def exit_fast_preview(scene):
+    snapshot = scene.get(FAST_PREVIEW_SNAPSHOT_KEY)
+    if snapshot is None:
+        return False
+    
+    for path, value in snapshot["settings"].items():
+        owner, attr = resolve_render_setting(scene, path)
+        if owner is not None:
+            setattr(owner, attr, value)
+    
+    view_layer = scene.view_layers.get(snapshot["view_layer"])
+    if view_layer is not None:
+        for name in snapshot["hidden"]:
+            obj = scene.objects.get(name)
+            if obj is not None:
+                obj.hide_set(False, view_layer=view_layer)
+    
+    del scene[FAST_PREVIEW_SNAPSHOT_KEY]
+    return True
+
+def end_fast_preview():
+    # bpy.app.timers callback; runs once the controls have been still for FAST_PREVIEW_DELAY.
+    for scene in bpy.data.scenes:
+        exit_fast_preview(scene)
+    return None
+
+def touch_fast_preview(scene):
+    enter_fast_preview(scene)
+    # Debounce: every change pushes the restore further out.
+    if bpy.app.timers.is_registered(end_fast_preview):
+        bpy.app.timers.unregister(end_fast_preview)
+    bpy.app.timers.register(end_fast_preview, first_interval=FAST_PREVIEW_DELAY)
+
+@profiled_update
+def update_fast_preview(self, context):
+    if not self.quickstudio_fast_preview:
+        if bpy.app.timers.is_registered(end_fast_preview):
+            bpy.app.timers.unregister(end_fast_preview)
+        exit_fast_preview(self)
+
+RENDER_QUEUE_MODES = [
+    ('CAMERA', "Orbit Camera", "Orbit the studio camera around its target"),
+    ('LIGHTS', "Orbit Lights", "Orbit the studio lights around the target"),
+    ('CAMERAS', "Scene Cameras", "Render through every other camera of the scene, in name order"),
+]
+
+def render_queue_center(rig):
+    if rig.use_camera_track and rig.camera_track:
+        return rig.camera_track.matrix_world.translation.copy()
+    if rig.camera_target:
+        return rig.camera_target.matrix_world.translation.copy()
+    return Vector(rig.frame_center)
+
+def render_queue_cameras(scene, rig):
+    rig_objects = set(rig.collection.objects) if rig.collection else set()
+    cameras = [obj for obj in scene.objects if obj.type == 'CAMERA' and obj not in rig_objects]
+    return sorted(cameras, key=lambda obj: obj.name)
+
+def render_manifest_path(output_dir, shard, shard_count):
+    if shard_count > 1:
+        return os.path.join(output_dir, f"quickstudio_queue.{shard + 1}of{shard_count}.json")
+    return os.path.join(output_dir, "quickstudio_queue.json")
+
+def load_render_manifest(path, job):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if manifest.get("job") != job:
+        return set()
+    return set(manifest.get("done", []))
+
+def write_render_manifest(path, job, done):
+    # Written to a temporary file first so a crash never leaves a truncated manifest.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": 1, "job": job, "done": sorted(done)}, f)
+    os.replace(tmp_path, path)
+
+def run_render_queue(scene, rig, output_dir, angles=8, mode='CAMERA', shard=0, shard_count=1, resume=True):
+    output_dir = bpy.path.abspath(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    
+    cameras = render_queue_cameras(scene, rig) if mode == 'CAMERAS' else []
+    count = len(cameras) if mode == 'CAMERAS' else angles
+    job = {
+        "blend": os.path.basename(bpy.data.filepath),
+        "studio": rig.name,
+        "mode": mode,
+        "angles": count,
+    }
+    manifest_path = render_manifest_path(output_dir, shard, shard_count)
+    done = load_render_manifest(manifest_path, job) if resume else set()
+    todo = [index for index in range(shard, count, shard_count) if index not in done]
+    
+    moved = []
+    if mode == 'CAMERA' and rig.camera:
+        moved = [rig.camera]
+    elif mode == 'LIGHTS':
+        moved = [light for _prefix, light in iter_rig_lights(rig)]
+    saved_basis = [obj.matrix_basis.copy() for obj in moved]
+    saved_camera = scene.camera
+    saved_filepath = scene.render.filepath
+    center = render_queue_center(rig)
+    
+    rendered = []
+    try:
+        for index in todo:
+            if mode == 'CAMERAS':
+                scene.camera = cameras[index]
+            else:
+                angle = 2.0 * math.pi * index / count
+                orbit = Matrix.Translation(center) @ Matrix.Rotation(angle, 4, 'Z') @ Matrix.Translation(-center)
+                for obj, basis in zip(moved, saved_basis):
+                    obj.matrix_basis = orbit @ basis
+                if rig.camera:
+                    scene.camera = rig.camera
             
-            bpy.data.collections.remove(studio_collection)
+            scene.render.filepath = os.path.join(output_dir, f"angle_{index:03d}")
+            bpy.ops.render.render(write_still=True, scene=scene.name)
             
-            self.report({'INFO'}, "Studio has been reset")
+            done.add(index)
+            write_render_manifest(manifest_path, job, done)
+            rendered.append(index)
+    finally:
+        for obj, basis in zip(moved, saved_basis):
+            obj.matrix_basis = basis
+        scene.camera = saved_camera
+        scene.render.filepath = saved_filepath
+    
+    return rendered
+
+def render_shard_command(filepath, output_dir, angles, mode, shard, shard_count, resume=True, render_profile=None):
+    # --python-exit-code makes a shard that raises exit non-zero instead of 0.
+    command = [bpy.app.binary_path, "--background", "--factory-startup", "--python-exit-code", "1", filepath,
+               "--python", os.path.abspath(__file__), "--",
+               "--render-queue", output_dir,
+               "--angles", str(angles),
+               "--mode", mode,
+               "--shard", str(shard),
+               "--shards", str(shard_count)]
+    if not resume:
+        command.append("--restart")
+    if render_profile:
+        command += ["--render-profile", render_profile]
+    return command
+
+class QUICKSTUDIO_OT_create_studio(bpy.types.Operator):
+    bl_idname = "quickstudio.create_studio"
+    bl_label = "Create Studio"
+    bl_description = "Create a camera and lighting setup"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    layout_type: bpy.props.EnumProperty(
+        name="Layout",
+        items=[
+            ('FOUR_POINT', "Four Point", "Key, fill, rim and back light"),
+            ('RING', "Ring", "Rings of lights around the target, one control group per ring"),
+            ('DOME', "Dome", "Rings of lights from low to high elevation covering a dome"),
+        ],
+        default='FOUR_POINT'
+    )
+    ring_count: bpy.props.IntProperty(
+        name="Rings",
+        default=1,
+        min=1,
+        max=32
+    )
+    lights_per_ring: bpy.props.IntProperty(
+        name="Lights per Ring",
+        default=16,
+        min=1,
+        max=512
+    )
+    incremental: bpy.props.BoolProperty(
+        name="Incremental",
+        description="Build in small steps from a timer so the interface stays responsive "
+                    "(on by default in scenes with many objects)",
+        default=False
+    )
+    
+    def invoke(self, context, event):
+        if not self.properties.is_property_set("incremental"):
+            self.incremental = len(context.scene.objects) > INCREMENTAL_BUILD_OBJECTS
+        return self.execute(context)
+    
+    def execute(self, context):
+        if _async_build["steps"] is not None:
+            self.report({'WARNING'}, "A studio is already being built")
+            return {'CANCELLED'}
+        
+        camera_matrix = None
+        if context.space_data and context.space_data.type == 'VIEW_3D':
+            camera_matrix = context.space_data.region_3d.view_matrix.inverted()
+        
+        if self.layout_type == 'RING':
+            layout = ring_layout(self.ring_count, self.lights_per_ring)
+        elif self.layout_type == 'DOME':
+            layout = ring_layout(max(self.ring_count, 3), self.lights_per_ring, min_elevation=10.0, max_elevation=80.0)
+        else:
+            layout = four_point_layout()
+        
+        options = {
+            "camera_matrix": camera_matrix,
+            "preset": get_preset(context.scene.quickstudio_preset),
+            "layout": layout,
+        }
+        if self.incremental:
+            start_async_build(context.scene, context.view_layer, **options)
+            self.report({'INFO'}, "Building studio...")
+            return {'FINISHED'}
+        
+        build_studio(context.scene, context.view_layer, **options)
+        relations = time_relations_update(context.view_layer)
+        
+        self.report({'INFO'}, f"Studio setup created successfully! (relations update {relations * 1000.0:.1f} ms)")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_cancel_build(bpy.types.Operator):
+    bl_idname = "quickstudio.cancel_build"
+    bl_label = "Cancel Studio Build"
+    bl_description = "Stop the incremental studio build and remove what it created"
+    bl_options = {'REGISTER'}
+    
+    def execute(self, context):
+        cancel_async_build()
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_reset_studio(bpy.types.Operator):
+    bl_idname = "quickstudio.reset_studio"
+    bl_label = "Reset Studio"
+    bl_description = "Delete the studio setup"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        scene = context.scene
+        rig = get_active_rig(scene)
+        
+        if rig is None:
+            self.report({'WARNING'}, "No studio to reset")
+            return {'FINISHED'}
+        
+        name = rig.name
+        freed = teardown_studio(scene, scene.quickstudio_active_rig)
+        
+        summary = ", ".join(f"{count} {kind}" for kind, count in freed.items() if count)
+        self.report({'INFO'}, f"Studio '{name}' has been reset (freed {summary or 'nothing'})")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_apply_render_profile(bpy.types.Operator):
+    bl_idname = "quickstudio.apply_render_profile"
+    bl_label = "Apply Render Profile"
+    bl_description = "Switch render samples, bounces, denoising and resolution to a profile"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    profile: bpy.props.EnumProperty(
+        name="Profile",
+        items=RENDER_PROFILE_ITEMS,
+        default='DRAFT'
+    )
+    
+    def execute(self, context):
+        apply_render_profile(context.scene, self.profile)
+        self.report({'INFO'}, f"Render profile: {self.profile.title()}")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_restore_render_settings(bpy.types.Operator):
+    bl_idname = "quickstudio.restore_render_settings"
+    bl_label = "Restore Render Settings"
+    bl_description = "Restore the render settings from before the first profile was applied"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    def execute(self, context):
+        if not restore_render_settings(context.scene):
+            self.report({'WARNING'}, "No render settings to restore")
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Render settings restored")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_render_queue(bpy.types.Operator):
+    bl_idname = "quickstudio.render_queue"
+    bl_label = "Render Angles"
+    bl_description = "Render the active studio from several angles into numbered files"
+    bl_options = {'REGISTER'}
+    
+    directory: bpy.props.StringProperty(
+        name="Output",
+        subtype='DIR_PATH',
+        default="//turntable/"
+    )
+    angles: bpy.props.IntProperty(
+        name="Angles",
+        default=8,
+        min=1,
+        max=360
+    )
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=RENDER_QUEUE_MODES,
+        default='CAMERA'
+    )
+    resume: bpy.props.BoolProperty(
+        name="Resume",
+        description="Skip angles already recorded as done in the queue manifest",
+        default=True
+    )
+    processes: bpy.props.IntProperty(
+        name="Processes",
+        description="Render in this many background Blender processes instead of the current session",
+        default=1,
+        min=1,
+        max=64
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return get_active_rig(context.scene) is not None
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        scene = context.scene
+        rig = get_active_rig(scene)
+        output_dir = bpy.path.abspath(self.directory)
+        
+        if self.processes == 1:
+            rendered = run_render_queue(scene, rig, output_dir, angles=self.angles, mode=self.mode,
+                                        resume=self.resume)
+            self.report({'INFO'}, f"Rendered {len(rendered)} angles to {output_dir}")
+            return {'FINISHED'}
+        
+        # Background processes render from a copy, so the open file stays untouched.
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, "quickstudio_queue.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=filepath, copy=True, relative_remap=True)
+        
+        # Each shard logs to its own file next to its manifest, errors included.
+        for shard in range(self.processes):
+            command = render_shard_command(filepath, output_dir, self.angles, self.mode, shard,
+                                           self.processes, resume=self.resume)
+            log_path = os.path.join(output_dir, f"quickstudio_queue.{shard + 1}of{self.processes}.log")
+            with open(log_path, "w") as log:
+                subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        
+        self.report({'INFO'}, f"Started {self.processes} render processes, writing to {output_dir} "
+                              f"(progress in quickstudio_queue.*of{self.processes}.json, "
+                              f"output in quickstudio_queue.*of{self.processes}.log)")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_auto_frame(bpy.types.Operator):
+    bl_idname = "quickstudio.auto_frame"
+    bl_label = "Frame Selected"
+    bl_description = "Fit the active studio's camera and lights to the selected objects"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        return get_active_rig(context.scene) is not None
+    
+    def execute(self, context):
+        rig = get_active_rig(context.scene)
+        rig_objects = set(rig.collection.objects) if rig.collection else set()
+        objects = [obj for obj in context.selected_objects if obj not in rig_objects]
+        
+        if objects:
+            framed = frame_rig(rig, objects, context.evaluated_depsgraph_get())
         else:
-            self.report({'WARNING'}, "No studio to reset")
+            framed = frame_rig_to_targets(context, rig)
+        
+        if not framed:
+            self.report({'WARNING'}, "Select objects or set a camera/lights target to frame")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_save_preset(bpy.types.Operator):
+    bl_idname = "quickstudio.save_preset"
+    bl_label = "Save Studio Preset"
+    bl_description = "Store the active studio's layout in the preset library"
+    bl_options = {'REGISTER'}
+    
+    name: bpy.props.StringProperty(
+        name="Name",
+        default="My Studio"
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return get_active_rig(context.scene) is not None
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        if self.name in BUILTIN_PRESETS:
+            self.report({'ERROR'}, f"'{self.name}' is a built-in preset")
+            return {'CANCELLED'}
+        
+        raw = capture_preset(context.scene, get_active_rig(context.scene))
+        try:
+            save_user_preset(self.name, raw)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not save preset: {e}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Preset '{self.name}' saved")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_reload_presets(bpy.types.Operator):
+    bl_idname = "quickstudio.reload_presets"
+    bl_label = "Reload Studio Presets"
+    bl_description = "Re-read the preset library from disk"
+    bl_options = {'REGISTER'}
+    
+    def execute(self, context):
+        load_preset_library(reload=True)
+        self.report({'INFO'}, f"Loaded {len(_preset_library)} presets")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_export_snapshot(bpy.types.Operator, ExportHelper):
+    bl_idname = "quickstudio.export_snapshot"
+    bl_label = "Export Studio Snapshot"
+    bl_description = "Save the whole state of the active studio to a snapshot file"
+    bl_options = {'REGISTER'}
+    
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.json.gz",
+        options={'HIDDEN'}
+    )
+    compress: bpy.props.BoolProperty(
+        name="Compress",
+        description="Write a gzip-compressed snapshot (.json.gz)",
+        default=False
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        return get_active_rig(context.scene) is not None
+    
+    def execute(self, context):
+        path = self.filepath
+        if self.compress and not path.endswith(".gz"):
+            path += ".gz"
+        
+        try:
+            write_snapshot(path, capture_snapshot(context.scene, get_active_rig(context.scene)))
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write snapshot: {e}")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Snapshot saved to {path}")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_import_snapshot(bpy.types.Operator, ImportHelper):
+    bl_idname = "quickstudio.import_snapshot"
+    bl_label = "Import Studio Snapshot"
+    bl_description = "Build a new studio from a snapshot file"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filename_ext = ".json"
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.json.gz",
+        options={'HIDDEN'}
+    )
+    
+    def execute(self, context):
+        try:
+            snapshot = read_snapshot(self.filepath)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, f"Could not read snapshot: {e}")
+            return {'CANCELLED'}
+        
+        rig, missing = apply_snapshot(context.scene, snapshot, context.view_layer)
+        if missing:
+            self.report({'WARNING'}, f"Studio '{rig.name}' created; targets not found: {', '.join(missing)}")
+        else:
+            self.report({'INFO'}, f"Studio '{rig.name}' created from snapshot")
+        return {'FINISHED'}
+
+_share_scene_items = []
+
+def share_scene_items(self, context):
+    items = [('ALL', "All Scenes", "Every other scene in the file")]
+    items += [(scene.name, scene.name, "") for scene in bpy.data.scenes if scene != context.scene]
+    # Blender only keeps the strings alive while Python references them.
+    _share_scene_items[:] = items
+    return _share_scene_items
+
+class QUICKSTUDIO_OT_share_studio(bpy.types.Operator):
+    bl_idname = "quickstudio.share_studio"
+    bl_label = "Share Studio"
+    bl_description = "Use the active studio in other scenes without copying its lights"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    target: bpy.props.EnumProperty(
+        name="Scenes",
+        items=share_scene_items
+    )
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('LINK', "Link", "Add the studio collection itself; the rig stays editable from every scene"),
+            ('INSTANCE', "Instance", "Add a collection instance; cheapest, can be moved but not edited"),
+        ],
+        default='LINK'
+    )
+    
+    @classmethod
+    def poll(cls, context):
+        rig = get_active_rig(context.scene)
+        return rig is not None and rig.collection is not None and len(bpy.data.scenes) > 1
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        rig = get_active_rig(context.scene)
+        if self.target == 'ALL':
+            scenes = [scene for scene in bpy.data.scenes if scene != context.scene]
+        else:
+            scenes = [bpy.data.scenes[self.target]]
+        
+        shared = sum(share_studio(rig, scene, self.mode) is not None for scene in scenes)
+        self.report({'INFO'}, f"Studio '{rig.name}' shared with {shared} scene(s)")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_link_library_studio(bpy.types.Operator, ImportHelper):
+    bl_idname = "quickstudio.link_library_studio"
+    bl_label = "Link Studio From Library"
+    bl_description = "Link the studios of another .blend file into this scene"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filename_ext = ".blend"
+    filter_glob: bpy.props.StringProperty(
+        default="*.blend",
+        options={'HIDDEN'}
+    )
+    override: bpy.props.BoolProperty(
+        name="Make Editable",
+        description="Create a library override so the rig can be adjusted in this scene",
+        default=False
+    )
+    
+    def execute(self, context):
+        try:
+            rigs = link_library_studios(context.scene, self.filepath, self.override, context.view_layer)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not load library: {e}")
+            return {'CANCELLED'}
+        
+        if not rigs:
+            self.report({'WARNING'}, "No studio found in the library")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Linked {', '.join(rig.name for rig in rigs)}")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_localize_studio(bpy.types.Operator):
+    bl_idname = "quickstudio.localize_studio"
+    bl_label = "Make Studio Local"
+    bl_description = "Replace the shared studio in this scene with a local copy that can be changed on its own"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    @classmethod
+    def poll(cls, context):
+        rig = get_active_rig(context.scene)
+        return rig is not None and rig.collection is not None and is_shared_studio(rig.collection)
+    
+    def execute(self, context):
+        scene = context.scene
+        rig = localize_studio(scene, scene.quickstudio_active_rig, context.view_layer)
+        self.report({'INFO'}, f"Studio '{rig.name}' is now local to '{scene.name}'")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_apply_light_cost_preset(bpy.types.Operator):
+    bl_idname = "quickstudio.apply_light_cost_preset"
+    bl_label = "Apply Light Cost Preset"
+    bl_description = "Set shadows, bounces and ray visibility of all studio light groups at once"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    preset: bpy.props.EnumProperty(
+        name="Preset",
+        items=LIGHT_COST_PRESET_ITEMS,
+        default='LOOKDEV'
+    )
+    scope: bpy.props.EnumProperty(
+        name="Studios",
+        items=RIG_SCOPE_ITEMS,
+        default='ACTIVE'
+    )
+    
+    def execute(self, context):
+        rigs = list(iter_rigs(context, self.scope))
+        if not rigs:
+            self.report({'WARNING'}, "No studio lights to edit")
+            return {'CANCELLED'}
+        
+        count = apply_light_cost_preset(rigs, self.preset)
+        self.report({'INFO'}, f"Applied {self.preset.title()} to {count} lights")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_bulk_edit_lights(bpy.types.Operator):
+    bl_idname = "quickstudio.bulk_edit_lights"
+    bl_label = "Bulk Edit Lights"
+    bl_description = "Scale exposure and colour of many studio lights at once"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    scope: bpy.props.EnumProperty(
+        name="Studios",
+        items=RIG_SCOPE_ITEMS,
+        default='SCENE'
+    )
+    exposure: bpy.props.FloatProperty(
+        name="Exposure",
+        description="Exposure change in stops",
+        default=0.0,
+        soft_min=-5.0,
+        soft_max=5.0
+    )
+    use_temperature: bpy.props.BoolProperty(
+        name="Set Colour Temperature",
+        default=False
+    )
+    temperature: bpy.props.FloatProperty(
+        name="Temperature",
+        description="Colour temperature in Kelvin",
+        default=6500.0,
+        min=1000.0,
+        max=40000.0
+    )
+    temperature_mix: bpy.props.FloatProperty(
+        name="Temperature Mix",
+        default=1.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    preset_blend: bpy.props.FloatProperty(
+        name="Blend to Default",
+        description="Blend energies towards the default studio layout",
+        default=0.0,
+        min=0.0,
+        max=1.0,
+        subtype='FACTOR'
+    )
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        temperature = self.temperature if self.use_temperature else None
+        count = bulk_edit_lights(iter_rigs(context, self.scope), exposure=self.exposure,
+                                 temperature=temperature, temperature_mix=self.temperature_mix,
+                                 preset_blend=self.preset_blend)
+        if not count:
+            self.report({'WARNING'}, "No studio lights to edit")
+            return {'CANCELLED'}
+        
+        self.report({'INFO'}, f"Updated {count} lights")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_benchmark_control_modes(bpy.types.Operator):
+    bl_idname = "quickstudio.benchmark_control_modes"
+    bl_label = "Benchmark Control Modes"
+    bl_description = "Compare frame-step time of driver and baked light controls"
+    bl_options = {'REGISTER'}
+    
+    frames: bpy.props.IntProperty(
+        name="Frames",
+        description="Number of frames to step through per mode",
+        default=250,
+        min=1
+    )
+    
+    def execute(self, context):
+        scene = context.scene
+        rig = get_active_rig(scene)
+        if rig is None or not rig.lights_control:
+            self.report({'WARNING'}, "No studio to benchmark")
+            return {'CANCELLED'}
+        
+        original_mode = rig.control_mode
+        original_frame = scene.frame_current
+        results = {}
+        
+        for mode in ('DRIVERS', 'BAKED'):
+            rig.control_mode = mode
+            scene.frame_set(scene.frame_start)
+            
+            start = time.perf_counter()
+            for frame in range(scene.frame_start, scene.frame_start + self.frames):
+                scene.frame_set(frame)
+            results[mode] = (time.perf_counter() - start) / self.frames * 1000.0
+        
+        rig.control_mode = original_mode
+        scene.frame_set(original_frame)
+        
+        message = (f"Frame step: drivers {results['DRIVERS']:.3f} ms, "
+                   f"baked {results['BAKED']:.3f} ms ({self.frames} frames)")
+        print(message)
+        self.report({'INFO'}, message)
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_benchmark_studio_cycle(bpy.types.Operator):
+    bl_idname = "quickstudio.benchmark_studio_cycle"
+    bl_label = "Benchmark Create/Reset"
+    bl_description = "Time repeated studio create/reset cycles and check for leftover datablocks"
+    bl_options = {'REGISTER'}
+    
+    cycles: bpy.props.IntProperty(
+        name="Cycles",
+        description="Number of create/reset cycles to run",
+        default=20,
+        min=1
+    )
+    
+    def execute(self, context):
+        # Cycles run in a throwaway scene: building sets the scene camera and the
+        # last teardown resets the world, none of which may reach the user's scene.
+        preset = get_preset(context.scene.quickstudio_preset)
+        collections = (bpy.data.objects, bpy.data.lights, bpy.data.cameras, bpy.data.collections, bpy.data.worlds)
+        before = [len(data) for data in collections]
+        scene = bpy.data.scenes.new("QS Benchmark")
+        build_time = 0.0
+        teardown_time = 0.0
+        
+        for _cycle in range(self.cycles):
+            start = time.perf_counter()
+            build_studio(scene, preset=preset)
+            build_time += time.perf_counter() - start
             
+            start = time.perf_counter()
+            teardown_studio(scene, scene.quickstudio_active_rig)
+            teardown_time += time.perf_counter() - start
+        
+        bpy.data.scenes.remove(scene)
+        leaked = sum(len(data) for data in collections) - sum(before)
+        message = (f"Create {build_time / self.cycles * 1000.0:.2f} ms, "
+                   f"reset {teardown_time / self.cycles * 1000.0:.2f} ms "
+                   f"({self.cycles} cycles, {leaked} leftover datablocks)")
+        print(message)
+        self.report({'INFO'} if leaked <= 0 else {'WARNING'}, message)
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_export_profile(bpy.types.Operator):
+    bl_idname = "quickstudio.export_profile"
+    bl_label = "Export Profile"
+    bl_description = "Write the callback profile as JSON statistics or a Chrome trace"
+    bl_options = {'REGISTER'}
+    
+    filepath: bpy.props.StringProperty(
+        name="File Path",
+        subtype='FILE_PATH'
+    )
+    file_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', "JSON", "Per-callback counts, total, mean and p95 times"),
+            ('TRACE', "Chrome Trace", "Every recorded call, for chrome://tracing or Perfetto"),
+        ],
+        default='JSON'
+    )
+    
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "quickstudio_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+    
+    def execute(self, context):
+        if not _profile_stats:
+            self.report({'WARNING'}, "Nothing profiled yet")
+            return {'CANCELLED'}
+        
+        path = bpy.path.abspath(self.filepath)
+        count = export_profile(path, self.file_format)
+        self.report({'INFO'}, f"Exported {count} entries to {path}")
+        return {'FINISHED'}
+
+class QUICKSTUDIO_OT_reset_profile(bpy.types.Operator):
+    bl_idname = "quickstudio.reset_profile"
+    bl_label = "Reset Profile"
+    bl_description = "Clear the recorded callback timings"
+    bl_options = {'REGISTER'}
+    
+    def execute(self, context):
+        reset_profile()
         return {'FINISHED'}
 
+@persistent
+def quickstudio_depsgraph_update(scene, depsgraph):
+    if _profiler["last"] is not None:
+        stats = _profile_stats.get(_profiler["last"])
+        if stats is not None:
+            stats["depsgraph_updates"] += len(depsgraph.updates)
+        _profiler["last"] = None
+    
+    if depsgraph.id_type_updated('COLLECTION'):
+        invalidate_rig_state()
+    
+    if scene.quickstudio_fast_preview and depsgraph.id_type_updated('OBJECT') and not bpy.app.background:
+        controls = {rig.lights_control.as_pointer() for rig in scene.quickstudio_rigs if rig.lights_control}
+        for update in depsgraph.updates:
+            if isinstance(update.id, bpy.types.Object) and update.id.original.as_pointer() in controls:
+                touch_fast_preview(scene)
+                break
+    
+    if _bounds_cache and depsgraph.id_type_updated('OBJECT'):
+        for update in depsgraph.updates:
+            if isinstance(update.id, bpy.types.Object) and (update.is_updated_geometry or update.is_updated_transform):
+                _bounds_cache.pop(update.id.original.as_pointer(), None)
+    
+    normalized = [rig for rig in scene.quickstudio_rigs if rig.normalize_exposure]
+    if normalized and depsgraph.id_type_updated('OBJECT'):
+        moved = {update.id.original.as_pointer() for update in depsgraph.updates
+                 if isinstance(update.id, bpy.types.Object) and (update.is_updated_geometry or update.is_updated_transform)}
+        for rig in normalized:
+            watched = (rig.light_target, rig.camera_target, rig.lights_control)
+            if any(obj is not None and obj.as_pointer() in moved for obj in watched):
+                normalize_rig_exposure(rig, depsgraph, evaluated=True)
+    
+    if depsgraph.id_type_updated('OBJECT'):
+        for rig in scene.quickstudio_rigs:
+            if rig.control_mode == 'BAKED':
+                sync_baked_controls(rig)
+
+@persistent
+def quickstudio_frame_change(scene, depsgraph=None):
+    # Frame changes send no depsgraph updates; animation, armatures or parents
+    # may have moved any target, so no cached bounds survive them.
+    _bounds_cache.clear()
+    
+    for rig in scene.quickstudio_rigs:
+        if rig.control_mode == 'BAKED':
+            sync_baked_controls(rig)
+
+@persistent
+def quickstudio_load_pre(*args):
+    # A pending build holds references to data that loading or undoing replaces.
+    cancel_async_build()
+    _async_build["message"] = ""
+
+@persistent
+def quickstudio_render_pre(scene, *args):
+    set_world_hdri_resolution(scene, full=True)
+
+@persistent
+def quickstudio_render_complete(scene, *args):
+    set_world_hdri_resolution(scene, full=False)
+
+@persistent
+def quickstudio_load_post(*args):
+    # Start over with the loaded file's setting so the panel matches what is recorded.
+    disable_profiler()
+    scene = bpy.context.scene
+    if scene is not None and scene.quickstudio_profile_callbacks:
+        enable_profiler()
+    # A file saved mid-drag still carries the lowered settings.
+    end_fast_preview()
+    _hdri_proxies.clear()
+    _baked_cache.clear()
+    _bounds_cache.clear()
+    invalidate_rig_state()
+    
+    for scene in bpy.data.scenes:
+        migrate_legacy_studios(scene)
+
+@persistent
+def quickstudio_undo_post(*args):
+    _bounds_cache.clear()
+    invalidate_rig_state()
+
 classes = (
+    QUICKSTUDIO_PG_rig_light,
+    QUICKSTUDIO_PG_rig_group,
+    QUICKSTUDIO_PG_rig,
     QUICKSTUDIO_PT_panel,
     QUICKSTUDIO_OT_create_studio,
+    QUICKSTUDIO_OT_cancel_build,
     QUICKSTUDIO_OT_reset_studio,
+    QUICKSTUDIO_OT_apply_render_profile,
+    QUICKSTUDIO_OT_restore_render_settings,
+    QUICKSTUDIO_OT_render_queue,
+    QUICKSTUDIO_OT_auto_frame,
+    QUICKSTUDIO_OT_save_preset,
+    QUICKSTUDIO_OT_reload_presets,
+    QUICKSTUDIO_OT_export_snapshot,
+    QUICKSTUDIO_OT_import_snapshot,
+    QUICKSTUDIO_OT_share_studio,
+    QUICKSTUDIO_OT_link_library_studio,
+    QUICKSTUDIO_OT_localize_studio,
+    QUICKSTUDIO_OT_apply_light_cost_preset,
+    QUICKSTUDIO_OT_bulk_edit_lights,
+    QUICKSTUDIO_OT_benchmark_control_modes,
+    QUICKSTUDIO_OT_benchmark_studio_cycle,
+    QUICKSTUDIO_OT_export_profile,
+    QUICKSTUDIO_OT_reset_profile,
 )
 
 def register():
@@ -448,79 +3375,362 @@ def register():
         name="Show Camera Settings",
         default=True
     )
-    bpy.types.Scene.quickstudio_show_key_light = bpy.props.BoolProperty(
-        name="Show Key Light Settings",
-        default=False
-    )
-    bpy.types.Scene.quickstudio_show_fill_light = bpy.props.BoolProperty(
-        name="Show Fill Light Settings",
-        default=False
+    bpy.types.Scene.quickstudio_rigs = bpy.props.CollectionProperty(
+        type=QUICKSTUDIO_PG_rig
     )
-    bpy.types.Scene.quickstudio_show_rim_light = bpy.props.BoolProperty(
-        name="Show Rim Light Settings",
-        default=False
+    bpy.types.Scene.quickstudio_active_rig = bpy.props.IntProperty(
+        name="Active Studio",
+        default=0
     )
-    bpy.types.Scene.quickstudio_show_back_light = bpy.props.BoolProperty(
-        name="Show Back Light Settings",
-        default=False
+    bpy.types.Scene.quickstudio_bg_color = bpy.props.FloatVectorProperty(
+        name="Background Color",
+        subtype='COLOR',
+        size=3,
+        min=0.0,
+        max=1.0,
+        default=(0.05, 0.05, 0.05),
+        update=update_background_color
     )
-    bpy.types.Scene.quickstudio_use_camera_track = bpy.props.BoolProperty(
-        name="Use Camera Track",
-        description="Create a null object to control the camera",
+    bpy.types.Scene.quickstudio_bg_transparent = bpy.props.BoolProperty(
+        name="Transparent Background",
         default=False,
-        update=update_camera_track_toggle
+        update=update_background_transparent
     )
-    bpy.types.Scene.quickstudio_camera_target = bpy.props.PointerProperty(
-        name="Camera Target",
-        type=bpy.types.Object,
-        update=update_camera_target
+    bpy.types.Scene.quickstudio_bg_mode = bpy.props.EnumProperty(
+        name="Background",
+        items=[
+            ('COLOR', "Color", "Flat background color"),
+            ('GRADIENT', "Gradient", "Procedural gradient from the ground to the sky"),
+            ('HDRI', "HDRI", "Environment image; the viewport shows a cached low-resolution copy"),
+        ],
+        default='COLOR',
+        update=update_background_color
     )
-    bpy.types.Scene.quickstudio_light_target = bpy.props.PointerProperty(
-        name="Lights Target",
-        type=bpy.types.Object,
-        update=update_light_target
+    bpy.types.Scene.quickstudio_hdri_path = bpy.props.StringProperty(
+        name="HDRI",
+        description="Environment image rendered at full resolution, previewed from a cached proxy",
+        subtype='FILE_PATH',
+        update=update_background_color
     )
-    bpy.types.Scene.quickstudio_dof_target = bpy.props.PointerProperty(
-        name="Focus Object",
-        type=bpy.types.Object,
-        update=update_dof_target
+    bpy.types.Scene.quickstudio_hdri_strength = bpy.props.FloatProperty(
+        name="Strength",
+        default=1.0,
+        min=0.0,
+        soft_max=10.0,
+        update=update_background_color
     )
-    bpy.types.Scene.quickstudio_dof_use_target = bpy.props.BoolProperty(
-        name="Use Target for DOF",
-        default=False,
-        update=update_dof_target
+    bpy.types.Scene.quickstudio_hdri_rotation = bpy.props.FloatProperty(
+        name="Rotation",
+        subtype='ANGLE',
+        default=0.0,
+        update=update_background_color
     )
-    bpy.types.Scene.quickstudio_bg_color = bpy.props.FloatVectorProperty(
-        name="Background Color",
+    bpy.types.Scene.quickstudio_gradient_top = bpy.props.FloatVectorProperty(
+        name="Sky Color",
         subtype='COLOR',
         size=3,
         min=0.0,
         max=1.0,
-        default=(0.05, 0.05, 0.05),
+        default=(0.6, 0.65, 0.7),
         update=update_background_color
     )
-    bpy.types.Scene.quickstudio_bg_transparent = bpy.props.BoolProperty(
-        name="Transparent Background",
+    bpy.types.Scene.quickstudio_gradient_bottom = bpy.props.FloatVectorProperty(
+        name="Ground Color",
+        subtype='COLOR',
+        size=3,
+        min=0.0,
+        max=1.0,
+        default=(0.02, 0.02, 0.02),
+        update=update_background_color
+    )
+    bpy.types.Scene.quickstudio_preset = bpy.props.EnumProperty(
+        name="Studio Preset",
+        description="Lighting layout applied to the active studio",
+        items=preset_items,
+        update=update_preset
+    )
+    bpy.types.Scene.quickstudio_render_profile = bpy.props.EnumProperty(
+        name="Render Profile",
+        items=[('NONE', "None", "Render settings are not managed by Quick Studio")] + RENDER_PROFILE_ITEMS,
+        default='NONE'
+    )
+    bpy.types.Scene.quickstudio_profile_redraw = bpy.props.BoolProperty(
+        name="Time Panel Redraws",
+        description="Measure how long the Quick Studio panel takes to draw",
         default=False,
-        update=update_background_transparent
+        update=update_profile_redraw
+    )
+    bpy.types.Scene.quickstudio_profile_callbacks = bpy.props.BoolProperty(
+        name="Time Callbacks",
+        description="Record call counts, times and triggered depsgraph updates of operators and property updates",
+        default=False,
+        update=update_profile_callbacks
+    )
+    bpy.types.Scene.quickstudio_show_profiler = bpy.props.BoolProperty(
+        name="Show Profiling",
+        default=False
+    )
+    bpy.types.Scene.quickstudio_fast_preview = bpy.props.BoolProperty(
+        name="Fast Preview",
+        description="Lower viewport samples, shadows and resolution and hide other lights "
+                    "while LIGHTS CONTROL values are being changed",
+        default=False,
+        update=update_fast_preview
     )
+    
+    bpy.app.handlers.depsgraph_update_post.append(quickstudio_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(quickstudio_frame_change)
+    bpy.app.handlers.render_pre.append(quickstudio_render_pre)
+    bpy.app.handlers.render_complete.append(quickstudio_render_complete)
+    bpy.app.handlers.render_cancel.append(quickstudio_render_complete)
+    bpy.app.handlers.load_pre.append(quickstudio_load_pre)
+    bpy.app.handlers.undo_pre.append(quickstudio_load_pre)
+    bpy.app.handlers.load_post.append(quickstudio_load_post)
+    bpy.app.handlers.undo_post.append(quickstudio_undo_post)
+    bpy.app.handlers.redo_post.append(quickstudio_undo_post)
 
 def unregister():
-    for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+    disable_profiler()
+    if bpy.app.timers.is_registered(end_fast_preview):
+        bpy.app.timers.unregister(end_fast_preview)
+    end_fast_preview()
+    cancel_async_build()
+    bpy.app.handlers.render_pre.remove(quickstudio_render_pre)
+    bpy.app.handlers.render_complete.remove(quickstudio_render_complete)
+    bpy.app.handlers.render_cancel.remove(quickstudio_render_complete)
+    bpy.app.handlers.load_pre.remove(quickstudio_load_pre)
+    bpy.app.handlers.undo_pre.remove(quickstudio_load_pre)
+    bpy.app.handlers.depsgraph_update_post.remove(quickstudio_depsgraph_update)
+    bpy.app.handlers.frame_change_post.remove(quickstudio_frame_change)
+    bpy.app.handlers.load_post.remove(quickstudio_load_post)
+    bpy.app.handlers.undo_post.remove(quickstudio_undo_post)
+    bpy.app.handlers.redo_post.remove(quickstudio_undo_post)
     
     del bpy.types.Scene.quickstudio_show_camera
-    del bpy.types.Scene.quickstudio_show_key_light
-    del bpy.types.Scene.quickstudio_show_fill_light
-    del bpy.types.Scene.quickstudio_show_rim_light
-    del bpy.types.Scene.quickstudio_show_back_light
-    del bpy.types.Scene.quickstudio_use_camera_track
-    del bpy.types.Scene.quickstudio_camera_target
-    del bpy.types.Scene.quickstudio_light_target
-    del bpy.types.Scene.quickstudio_dof_target
-    del bpy.types.Scene.quickstudio_dof_use_target
+    del bpy.types.Scene.quickstudio_rigs
+    del bpy.types.Scene.quickstudio_active_rig
     del bpy.types.Scene.quickstudio_bg_color
     del bpy.types.Scene.quickstudio_bg_transparent
+    del bpy.types.Scene.quickstudio_bg_mode
+    del bpy.types.Scene.quickstudio_hdri_path
+    del bpy.types.Scene.quickstudio_hdri_strength
+    del bpy.types.Scene.quickstudio_hdri_rotation
+    del bpy.types.Scene.quickstudio_gradient_top
+    del bpy.types.Scene.quickstudio_gradient_bottom
+    del bpy.types.Scene.quickstudio_preset
+    del bpy.types.Scene.quickstudio_render_profile
+    del bpy.types.Scene.quickstudio_profile_redraw
+    del bpy.types.Scene.quickstudio_profile_callbacks
+    del bpy.types.Scene.quickstudio_show_profiler
+    del bpy.types.Scene.quickstudio_fast_preview
+    
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
+
+def parse_cli_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    
+    parser = argparse.ArgumentParser(
+        prog="blender --background --python studio-setup.py --",
+        description="Build Quick Studio rigs without a 3D viewport",
+    )
+    parser.add_argument("--build", action="store_true",
+                        help="Build a studio in the opened .blend file and save it")
+    parser.add_argument("--batch", metavar="DIR",
+                        help="Build a studio in every .blend file found in DIR")
+    parser.add_argument("--recursive", action="store_true",
+                        help="Also search sub-directories of the batch directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of Blender processes to run in parallel")
+    parser.add_argument("--output", metavar="PATH",
+                        help="Save to this file (or directory in batch mode) instead of overwriting")
+    parser.add_argument("--report", metavar="FILE",
+                        help="Write per-file timings as JSON")
+    parser.add_argument("--render-queue", metavar="DIR",
+                        help="Render the active studio from several angles into DIR")
+    parser.add_argument("--angles", type=int, default=8,
+                        help="Number of angles to render")
+    parser.add_argument("--mode", choices=[item[0] for item in RENDER_QUEUE_MODES], default='CAMERA',
+                        help="How the angles are produced")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="Split the angles across this many Blender processes")
+    parser.add_argument("--shard", type=int,
+                        help="Render only this shard (0-based), used by the shard driver")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore the queue manifest and render every angle again")
+    parser.add_argument("--render-profile", choices=list(RENDER_PROFILES),
+                        help="Render profile to use for the queue")
+    parser.add_argument("--preset", metavar="NAME",
+                        help="Studio preset to apply to the new rig")
+    parser.add_argument("--apply-snapshot", metavar="FILE",
+                        help="Build the studio from a snapshot file instead of the layout options")
+    parser.add_argument("--camera-matrix", type=float, nargs=16, metavar="M",
+                        help="Camera world matrix, 16 values in row-major order")
+    parser.add_argument("--target", type=float, nargs=3, default=(0.0, 0.0, 0.0))
+    parser.add_argument("--distance", type=float, default=12.0)
+    parser.add_argument("--elevation", type=float, default=20.0)
+    parser.add_argument("--azimuth", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+def build_options_to_argv(args):
+    argv = ["--target", *map(str, args.target),
+            "--distance", str(args.distance),
+            "--elevation", str(args.elevation),
+            "--azimuth", str(args.azimuth)]
+    if args.camera_matrix:
+        argv += ["--camera-matrix", *map(str, args.camera_matrix)]
+    if args.preset:
+        argv += ["--preset", args.preset]
+    if args.apply_snapshot:
+        argv += ["--apply-snapshot", os.path.abspath(args.apply_snapshot)]
+    return argv
+
+def build_current_file(args):
+    start = time.perf_counter()
+    
+    scene = bpy.context.scene
+    camera_matrix = None
+    if args.camera_matrix:
+        values = args.camera_matrix
+        camera_matrix = Matrix([values[0:4], values[4:8], values[8:12], values[12:16]])
+    framing = {
+        "target": args.target,
+        "distance": args.distance,
+        "elevation": args.elevation,
+        "azimuth": args.azimuth,
+    }
+    preset = None
+    if args.preset:
+        preset = get_preset(args.preset)
+        if preset is None:
+            raise SystemExit(f"Unknown studio preset '{args.preset}'")
+    
+    missing = []
+    if args.apply_snapshot:
+        try:
+            snapshot = read_snapshot(args.apply_snapshot)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"Could not read snapshot: {e}")
+        missing = apply_snapshot(scene, snapshot)[1]
+    else:
+        build_studio(scene, camera_matrix=camera_matrix, framing=framing, preset=preset)
+    build_time = time.perf_counter() - start
+    
+    filepath = args.output or bpy.data.filepath
+    bpy.ops.wm.save_as_mainfile(filepath=filepath)
+    
+    result = {
+        "file": bpy.data.filepath,
+        "build_time": build_time,
+        "total_time": time.perf_counter() - start,
+    }
+    if missing:
+        result["missing_targets"] = missing
+    print("QUICKSTUDIO_RESULT " + json.dumps(result))
+    return result
+
+def run_batch_file(filepath, args):
+    # Each file gets its own Blender process, the thread pool only waits on them.
+    # Without --python-exit-code Blender exits 0 after an uncaught exception in the script.
+    command = [bpy.app.binary_path, "--background", "--factory-startup", "--python-exit-code", "1", filepath,
+               "--python", os.path.abspath(__file__), "--", "--build"]
+    command += build_options_to_argv(args)
+    if args.output:
+        command += ["--output", os.path.join(args.output, os.path.basename(filepath))]
+    
+    start = time.perf_counter()
+    proc = subprocess.run(command, capture_output=True, text=True)
+    result = {
+        "file": filepath,
+        "returncode": proc.returncode,
+        "wall_time": time.perf_counter() - start,
+    }
+    reported = False
+    for line in proc.stdout.splitlines():
+        if line.startswith("QUICKSTUDIO_RESULT "):
+            result.update(json.loads(line[len("QUICKSTUDIO_RESULT "):]))
+            result["file"] = filepath
+            reported = True
+    if proc.returncode != 0:
+        result["error"] = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+    elif not reported:
+        result["error"] = "worker exited without reporting a result"
+    return result
+
+def run_batch(args):
+    pattern = "**/*.blend" if args.recursive else "*.blend"
+    files = sorted(glob.glob(os.path.join(args.batch, pattern), recursive=args.recursive))
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for result in pool.map(lambda f: run_batch_file(f, args), files):
+            status = "FAILED" if "error" in result else "ok"
+            print(f"{status:6} {result['wall_time']:8.2f}s  {result['file']}")
+            results.append(result)
+    
+    total = time.perf_counter() - start
+    failed = sum(1 for r in results if "error" in r)
+    print(f"Processed {len(results)} files in {total:.2f}s ({failed} failed)")
+    
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"total_time": total, "workers": args.workers, "files": results}, f, indent=2)
+    return results
+
+def render_current_file(args):
+    scene = bpy.context.scene
+    rig = get_active_rig(scene)
+    if rig is None:
+        raise SystemExit("No studio in this file to render")
+    
+    if args.render_profile:
+        apply_render_profile(scene, args.render_profile)
+    
+    shard = args.shard or 0
+    if args.shards > 1:
+        # Share the machine's cores between the shard processes.
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = max(1, (os.cpu_count() or 1) // args.shards)
+    
+    start = time.perf_counter()
+    rendered = run_render_queue(scene, rig, args.render_queue, angles=args.angles, mode=args.mode,
+                                shard=shard, shard_count=args.shards, resume=not args.restart)
+    print(f"Shard {shard + 1}/{args.shards}: rendered {len(rendered)} angles "
+          f"in {time.perf_counter() - start:.2f}s")
+
+def run_render_shards(args):
+    if not bpy.data.filepath:
+        raise SystemExit("Open a saved .blend file to render in several processes")
+    
+    output_dir = os.path.abspath(bpy.path.abspath(args.render_queue))
+    commands = [
+        render_shard_command(bpy.data.filepath, output_dir, args.angles, args.mode, shard,
+                             args.shards, resume=not args.restart, render_profile=args.render_profile)
+        for shard in range(args.shards)
+    ]
+    with ThreadPoolExecutor(max_workers=args.shards) as pool:
+        returncodes = list(pool.map(lambda command: subprocess.run(command).returncode, commands))
+    
+    failed = sum(1 for code in returncodes if code != 0)
+    print(f"Render queue finished: {args.shards} processes, {failed} failed")
+
+def main(argv):
+    if "--" not in argv:
+        return
+    args = parse_cli_args(argv)
+    if args.batch:
+        run_batch(args)
+    elif args.build or args.apply_snapshot:
+        build_current_file(args)
+    elif args.render_queue:
+        if args.shards > 1 and args.shard is None:
+            run_render_shards(args)
+        else:
+            render_current_file(args)
 
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
+    main(sys.argv)
\ No newline at end of file